@@ -8,6 +8,10 @@ app = Celery("EventManagement")
 
 app.conf.broker_connection_retry_on_startup = True
 app.config_from_object("django.conf:settings", namespace="CELERY")
+
+# Connects the signal handlers recording the task metrics, once the settings module is set
+import utils.metrics  # noqa: E402, F401
+
 app.autodiscover_tasks()
 
 
@@ -28,14 +28,18 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
+    "django_filters",
     "drf_spectacular",
     "events",
     "users",
 ]
 
 MIDDLEWARE = [
+    "utils.metrics.MetricsMiddleware",
+    "utils.middleware.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -82,6 +86,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Redis in production (set CACHE_REDIS_URL), local memory otherwise (development and tests)
+
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+if CACHE_REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds the serialized event and company payloads are cached for (they are also invalidated on every change)
+API_RESPONSE_CACHE_TIMEOUT = int(os.getenv("API_RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Authenticate JWT requests from cached snapshots of the users and their profiles instead of
+# a database query (see users/authentication.py), and seconds the snapshots are cached for
+JWT_USER_CACHE = os.getenv("JWT_USER_CACHE", "False").lower() in ("1", "true")
+JWT_USER_CACHE_TIMEOUT = int(os.getenv("JWT_USER_CACHE_TIMEOUT", "60"))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -104,10 +136,45 @@ REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication" if JWT_USER_CACHE else "users.authentication.JWTAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "utils.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ],
 }
 
+# Number of rows fetched, serialized and sent at a time by streaming responses (see utils/renderers.py)
+API_STREAMING_CHUNK_SIZE = int(os.getenv("API_STREAMING_CHUNK_SIZE", "2000"))
+
+# Keyset pagination (see utils/pagination.py)
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "50"))
+API_MAX_PAGE_SIZE = int(os.getenv("API_MAX_PAGE_SIZE", "500"))
+
+# Build event and registration lists from `.values()` rows instead of model instances (see utils/values.py)
+API_VALUES_SERIALIZATION = os.getenv("API_VALUES_SERIALIZATION", "False").lower() in ("1", "true")
+
+# Number of rows validated and inserted at a time by event imports (see events/importers.py)
+EVENT_IMPORT_CHUNK_SIZE = int(os.getenv("EVENT_IMPORT_CHUNK_SIZE", "2000"))
+
+# Seconds the event facet counts are cached for (they are also invalidated on every event change)
+EVENT_FACETS_CACHE_TIMEOUT = int(os.getenv("EVENT_FACETS_CACHE_TIMEOUT", "600"))
+
+# Record the query count, database time and slowest statements of every request (see utils/middleware.py),
+# sent to staff users in a `Server-Timing` header
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "False").lower() in ("1", "true")
+SQL_SLOWEST_QUERIES = int(os.getenv("SQL_SLOWEST_QUERIES", "3"))
+# Requests above these query count or database time (milliseconds) are logged with their slowest statements
+SQL_SLOW_REQUEST_QUERIES = int(os.getenv("SQL_SLOW_REQUEST_QUERIES", "50"))
+SQL_SLOW_REQUEST_MS = int(os.getenv("SQL_SLOW_REQUEST_MS", "200"))
+# Statements executed this many times by a request are logged as possible N+1 queries, with their call site
+SQL_REPEATED_QUERY_THRESHOLD = int(os.getenv("SQL_REPEATED_QUERY_THRESHOLD", "10"))
+
+# Collect request, database and Celery task metrics (see utils/metrics.py), served in the Prometheus text format
+# to admins at /metrics, and by Celery workers on METRICS_WORKER_PORT (plus the index of prefork pool processes)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "False").lower() in ("1", "true")
+METRICS_WORKER_PORT = int(os.getenv("METRICS_WORKER_PORT", "9540"))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "EventManagement",
     "DESCRIPTION": "Event Management for working with Events",
@@ -128,6 +195,7 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_LIFETIME": timedelta(days=30),
     "SLIDING_TOKEN_REFRESH_LIFETIME_LATE_USER": timedelta(days=1),
     "SLIDING_TOKEN_LIFETIME_LATE_USER": timedelta(days=30),
+    "TOKEN_OBTAIN_SERIALIZER": "users.api.serializers.TokenObtainPairSerializer",
 }
 
 
@@ -73,9 +73,10 @@ class EventAdmin(admin.ModelAdmin):
 
     form = EventForm
 
-    list_display = ("title", "event_start_date", "event_start_time", "status")
+    list_display = ("title", "event_start_date", "event_start_time", "status", "confirmed_count", "waitlist_count")
     search_fields = ("title", "description", "organizer__user__email", "company__name")
     list_filter = ("status", "event_start_date", "event_start_time", "city", "country", "organizer__user__email")
+    readonly_fields = ("confirmed_count", "waitlist_count")
     inlines = [EventSocialMediaInline]
 
 
@@ -0,0 +1,84 @@
+import django_filters
+from django.db.models import Exists, OuterRef
+
+from events.models import Event, EventRegistration, EventTopic
+from utils.choices import DeliveryType, EventRegistrationStatus, EventStatus, EventType
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    """
+    Comma-separated list of numbers, e.g. `?topics=1,2,3`.
+    """
+
+
+class EventFilter(django_filters.FilterSet):
+    """
+    Filters for the event list. Every filter is backed by an index on `Event` or on the topics through-table.
+    """
+
+    status = django_filters.MultipleChoiceFilter(choices=EventStatus.choices)
+    event_type = django_filters.MultipleChoiceFilter(choices=EventType.choices)
+    delivery_type = django_filters.MultipleChoiceFilter(choices=DeliveryType.choices)
+    city = django_filters.CharFilter()
+    country = django_filters.CharFilter()
+    company = django_filters.UUIDFilter(field_name="company_id")
+    organizer = django_filters.NumberFilter(field_name="organizer_id")
+    topics = NumberInFilter(method="filter_topics", help_text="Comma-separated topic ids.")
+    topics_match = django_filters.ChoiceFilter(
+        choices=[("any", "Any"), ("all", "All")],
+        method="filter_topics_match",
+        help_text="Whether events must have any (default) or all of the given topics.",
+    )
+    start_date = django_filters.DateFromToRangeFilter(field_name="event_start_date")
+
+    class Meta:
+        model = Event
+        fields = [
+            "status",
+            "event_type",
+            "delivery_type",
+            "city",
+            "country",
+            "company",
+            "organizer",
+            "topics",
+            "topics_match",
+            "start_date",
+        ]
+
+    def filter_topics(self, queryset, name, value):
+        """
+        Filter events having any or all of the given topics, using EXISTS lookups on the through-table
+        instead of a join, so that events are never duplicated.
+        """
+        topic_ids = set(value)
+        if not topic_ids:
+            return queryset
+
+        event_topics = EventTopic.objects.filter(event=OuterRef("pk"))
+        if self.form.cleaned_data.get("topics_match") == "all":
+            for topic_id in topic_ids:
+                queryset = queryset.filter(Exists(event_topics.filter(topic_id=topic_id)))
+            return queryset
+        return queryset.filter(Exists(event_topics.filter(topic_id__in=topic_ids)))
+
+    def filter_topics_match(self, queryset, name, value):
+        """
+        Applied by `filter_topics`.
+        """
+        return queryset
+
+
+class EventRegistrationFilter(django_filters.FilterSet):
+    """
+    Filters for the registration list, backed by the `registration_event_idx` and `registration_event_status_idx`
+    indexes on `EventRegistration`.
+    """
+
+    status = django_filters.MultipleChoiceFilter(choices=EventRegistrationStatus.choices)
+    event = django_filters.UUIDFilter(field_name="event_id")
+    created = django_filters.DateFromToRangeFilter(field_name="created_at")
+
+    class Meta:
+        model = EventRegistration
+        fields = ["status", "event", "created"]
@@ -0,0 +1,33 @@
+from utils.pagination import KeysetPagination
+
+
+class EventCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for events, matching `Event.Meta.ordering` and the `event_keyset_idx` index.
+    """
+
+    ordering = ("-event_start_date", "event_start_time", "id")
+
+
+class CompanyCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for companies, ordered by the unique slug.
+    """
+
+    ordering = ("slug",)
+
+
+class EventSearchPagination(KeysetPagination):
+    """
+    Keyset pagination for event search results, ordered by relevance first.
+    """
+
+    ordering = ("-search_rank", "-event_start_date", "event_start_time", "id")
+
+
+class EventRegistrationCursorPagination(KeysetPagination):
+    """
+    Keyset pagination for registrations, newest first, matching the `registration_keyset_idx` index.
+    """
+
+    ordering = ("-created_at", "id")
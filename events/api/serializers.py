@@ -1,10 +1,24 @@
+from collections import defaultdict
+
 from django.db import IntegrityError
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
-from events.models import Topic, Company, CompanySocialMedia, EventSocialMedia, Event, EventRegistration
-from users.models import Organizer, Participant
+from events.models import Topic, Company, CompanySocialMedia, EventSocialMedia, Event, EventRegistration, EventTopic
 from utils.choices import EventRegistrationStatus
+from utils.serializers import SparseFieldsetMixin
+from utils.values import ValuesSerializer
+
+
+def validate_event_dates(data, instance=None):
+    """
+    Reject an event ending before it starts, which the `event_end_date_gte_event_start_date` constraint
+    would otherwise reject on save. Fields missing from a partial update are read from the instance.
+    """
+    start_date = data.get("event_start_date", getattr(instance, "event_start_date", None))
+    end_date = data.get("event_end_date", getattr(instance, "event_end_date", None))
+    if start_date and end_date and end_date < start_date:
+        raise ValidationError({"event_end_date": "The end date cannot be before the start date."})
 
 
 class CompanySocialMediaSerializer(serializers.ModelSerializer):
@@ -129,9 +143,10 @@ class EventSocialMediaSerializer(serializers.ModelSerializer):
         return instance
 
 
-class EventSerializer(serializers.ModelSerializer):
+class EventSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
-    Serializer for processing information about the event and its social networks
+    Serializer for processing information about the event and its social networks.
+    Read requests can select the returned fields with `?fields=` / `?omit=`.
     """
 
     social_media = CompanySocialMediaSerializer(many=True, required=False)
@@ -166,6 +181,8 @@ class EventSerializer(serializers.ModelSerializer):
             "available_capacity",
         ]
         read_only_fields = ["id", "slug", "created_at", "updated_at", "available_capacity"]
+        # Columns read by computed fields, see `SparseFieldsetMixin.get_model_field_names`
+        field_dependencies = {"available_capacity": ["capacity", "confirmed_count"]}
 
     def __init__(self, *args, **kwargs):
         """
@@ -185,13 +202,10 @@ class EventSerializer(serializers.ModelSerializer):
         Modify the 'organizer' field dynamically based on the user's role.
         If the user is an organizer, set the 'organizer' field to the logged-in user.
         """
+        validate_event_dates(data, self.instance)
         user = self.context["request"].user
         if user.is_organizer():
-            try:
-                organizer = Organizer.objects.get(user=user)
-                data["organizer"] = organizer
-            except Organizer.DoesNotExist:
-                raise ValidationError("The current user is not associated with any organizer profile.")
+            data["organizer"] = user.organizer_profile
         return data
 
     def create(self, validated_data):
@@ -268,6 +282,51 @@ class EventSerializer(serializers.ModelSerializer):
         return obj.available_capacity
 
 
+class EventListSerializer(EventSerializer):
+    """
+    Compact representation of events in listings. Other fields can still be requested with `?fields=`.
+    """
+
+    class Meta(EventSerializer.Meta):
+        default_fields = [
+            "id",
+            "title",
+            "event_start_time",
+            "event_start_date",
+            "city",
+            "country",
+            "delivery_type",
+            "status",
+            "event_type",
+            "slug",
+            "available_capacity",
+        ]
+
+
+class EventValuesSerializer(ValuesSerializer):
+    """
+    Builds `EventSerializer` and `EventListSerializer` payloads from `.values()` rows.
+    """
+
+    def resolve_topics(self, rows):
+        topic_ids = defaultdict(list)
+        event_topics = EventTopic.objects.filter(event_id__in=[row["id"] for row in rows])
+        for event_id, topic_id in event_topics.values_list("event_id", "topic_id"):
+            topic_ids[event_id].append(topic_id)
+        return [topic_ids[row["id"]] for row in rows]
+
+    def resolve_social_media(self, rows):
+        social_media = defaultdict(list)
+        links = EventSocialMedia.objects.filter(event_id__in=[row["id"] for row in rows])
+        for event_id, platform, url in links.values_list("event_id", "platform", "url"):
+            social_media[event_id].append({"platform": platform, "url": url})
+        return [social_media[row["id"]] for row in rows]
+
+    def resolve_available_capacity(self, rows):
+        # Same as `Event.available_capacity`
+        return [row["capacity"] - row["confirmed_count"] if row["capacity"] else None for row in rows]
+
+
 class EventRegistrationSerializer(serializers.ModelSerializer):
     status = serializers.ChoiceField(choices=EventRegistrationStatus.choices, default=EventRegistrationStatus.PENDING)
 
@@ -275,6 +334,8 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
         model = EventRegistration
         fields = ["id", "participant", "event", "status", "created_at", "updated_at"]
         read_only_fields = ["id", "status", "created_at", "updated_at"]
+        # Duplicates are rejected by the unique constraint on insert, see `create`
+        validators = []
 
     def __init__(self, *args, **kwargs):
         """
@@ -297,26 +358,18 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
         """
         user = self.context["request"].user
         if user.is_participant():
-            try:
-                participant = Participant.objects.get(user=user)
-                data["participant"] = participant
-            except Participant.DoesNotExist:
-                raise ValidationError("The current user is not associated with any participant profile.")
+            data["participant"] = user.participant_profile
         return data
 
     def create(self, validated_data):
         """
         Handle the registration of the participant for an event.
         """
-        participant = validated_data["participant"]
-        event = validated_data["event"]
-
-        if EventRegistration.objects.filter(participant=participant, event=event).exists():
+        try:
+            return EventRegistration.objects.create(**validated_data)
+        except IntegrityError:
             raise serializers.ValidationError("Participant is already registered for this event.")
 
-        registration = EventRegistration.objects.create(**validated_data)
-        return registration
-
     def update(self, instance, validated_data):
         """
         Handle the update of the registration.
@@ -324,3 +377,93 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
         instance.status = validated_data.get("status", instance.status)
         instance.save()
         return instance
+
+
+class EventRegistrationBulkSerializer(serializers.Serializer):
+    """
+    Serializer for registering many participants for an event at once.
+    """
+
+    # Maximum number of participants registered by one request
+    MAX_PARTICIPANTS = 1000
+
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all())
+    participants = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_PARTICIPANTS
+    )
+    status = serializers.ChoiceField(
+        choices=[EventRegistrationStatus.PENDING, EventRegistrationStatus.CONFIRMED],
+        default=EventRegistrationStatus.CONFIRMED,
+    )
+
+
+class EventRegistrationBulkStatusSerializer(serializers.Serializer):
+    """
+    Serializer for changing the status of many registrations at once, selected by id or by event and status.
+    """
+
+    # Maximum number of registration ids accepted by one request
+    MAX_IDS = 10000
+
+    status = serializers.ChoiceField(choices=EventRegistrationStatus.choices)
+    ids = serializers.ListField(child=serializers.UUIDField(), required=False, allow_empty=False, max_length=MAX_IDS)
+    event = serializers.UUIDField(required=False)
+    current_status = serializers.ChoiceField(choices=EventRegistrationStatus.choices, required=False)
+
+    def validate(self, data):
+        """
+        Require the registrations to be selected by id or by event.
+        """
+        if "ids" not in data and "event" not in data:
+            raise ValidationError("Provide the registration `ids`, or an `event` to update its registrations.")
+        return data
+
+
+class EventImportSerializer(serializers.ModelSerializer):
+    """
+    Serializer validating one row of an event import, see `events.importers.EventImporter`.
+    The company, organizer and topics are given by id and resolved by the importer for a whole chunk of rows.
+    """
+
+    company = serializers.UUIDField()
+    organizer = serializers.IntegerField(min_value=1)
+    topics = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, default=list)
+    social_media = EventSocialMediaSerializer(many=True, required=False, default=list)
+
+    class Meta:
+        model = Event
+        fields = [
+            "title",
+            "description",
+            "event_start_time",
+            "event_end_time",
+            "event_start_date",
+            "event_end_date",
+            "city",
+            "country",
+            "location",
+            "capacity",
+            "delivery_type",
+            "status",
+            "event_type",
+            "topics",
+            "company",
+            "organizer",
+            "social_media",
+        ]
+
+    def validate_social_media(self, value):
+        """
+        Reject rows linking the same platform twice, which the unique constraint would reject on insert.
+        """
+        platforms = [social_media["platform"] for social_media in value]
+        if len(platforms) != len(set(platforms)):
+            raise ValidationError("Ensure that all provided social media platforms are unique.")
+        return value
+
+    def validate(self, data):
+        """
+        Reject rows ending before they start, like `EventSerializer`.
+        """
+        validate_event_dates(data)
+        return data
@@ -1,21 +1,39 @@
 from django.urls import path
 
+from events.api.pagination import EventSearchPagination
 from events.api.views import (
     CompanyViewSet,
     EventViewSet,
     EventRegistrationListView,
+    EventRegistrationBulkCreateView,
+    EventRegistrationBulkStatusView,
     EventRegistrationCreateView,
+    EventRegistrationExportView,
     EventRegistrationUpdateView,
+    EventImportView,
+    ResponseCacheStatsView,
 )
 
 urlpatterns = [
     path("", EventViewSet.as_view({"get": "list"}), name="event_list"),
     path("create/", EventViewSet.as_view({"post": "create"}), name="event_create"),
+    path(
+        "search/",
+        EventViewSet.as_view({"get": "search"}, pagination_class=EventSearchPagination),
+        name="event_search",
+    ),
+    path("facets/", EventViewSet.as_view({"get": "facets"}), name="event_facets"),
+    path("import/", EventImportView.as_view(), name="event_import"),
     path(
         "<str:id>/",
         EventViewSet.as_view({"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}),
         name="event_detail",
     ),
+    path(
+        "<str:id>/registrations/export/",
+        EventRegistrationExportView.as_view(),
+        name="event_registrations_export",
+    ),
     path("companies/list/", CompanyViewSet.as_view({"get": "list"}), name="companies_list"),
     path("companies/create/", CompanyViewSet.as_view({"post": "create"}), name="company_create"),
     path(
@@ -23,7 +41,14 @@ urlpatterns = [
         CompanyViewSet.as_view({"get": "retrieve", "put": "update", "patch": "partial_update", "delete": "destroy"}),
         name="company_detail",
     ),
+    path("cache/stats/", ResponseCacheStatsView.as_view(), name="response_cache_stats"),
     path("registrations/list/", EventRegistrationListView.as_view(), name="event_registrations_list"),
     path("registrations/create/", EventRegistrationCreateView.as_view(), name="event_registrations_create"),
+    path("registrations/bulk/", EventRegistrationBulkCreateView.as_view(), name="event_registrations_bulk_create"),
+    path(
+        "registrations/bulk/status/",
+        EventRegistrationBulkStatusView.as_view(),
+        name="event_registrations_bulk_status",
+    ),
     path("registrations/<str:id>/update/", EventRegistrationUpdateView.as_view(), name="event_registration_update"),
 ]
@@ -1,26 +1,76 @@
+import io
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter, OpenApiResponse
-from rest_framework import viewsets, status
+from rest_framework import generics, serializers, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.generics import get_object_or_404
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from events.api.serializers import CompanySerializer, EventSerializer, EventRegistrationSerializer
+from events.api.filters import EventFilter, EventRegistrationFilter
+from events.api.pagination import (
+    CompanyCursorPagination,
+    EventCursorPagination,
+    EventRegistrationCursorPagination,
+)
+from events.api.serializers import (
+    CompanySerializer,
+    EventRegistrationBulkSerializer,
+    EventRegistrationBulkStatusSerializer,
+    EventListSerializer,
+    EventRegistrationSerializer,
+    EventSerializer,
+    EventValuesSerializer,
+)
+from events.importers import ROW_READERS, EventImporter, get_import_format
 from events.models import Company, Event, EventRegistration
+from events.signals import COMPANIES_CACHE_NAMESPACE, EVENT_FACETS_CACHE_NAMESPACE, EVENTS_CACHE_NAMESPACE
+from utils.cache import CachedResponseMixin, get_response_cache_stats, make_cache_key
+from utils.conditional import ConditionalGetMixin
 from utils.permissions import (
     IsAdminOrReadOnly,
     IsEventOrganizerOrAdminUserOrReadOnly,
     IsOrganizerOrAdminUser,
     IsParticipantOrAdminUser,
 )
-from utils.tasks import send_registration_email
+from utils.renderers import CSVRenderer, NDJSONRenderer, StreamingJSONRenderer, iterate_representations
+from utils.tasks import send_bulk_registration_emails, send_registration_email
+from utils.values import ValuesListMixin
+
+# Query parameters selecting the fields of event payloads, see `utils.serializers.SparseFieldsetMixin`
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(
+        name="fields",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description="Comma-separated fields to return, e.g. `id,title,event_start_date`.",
+    ),
+    OpenApiParameter(
+        name="omit",
+        type=OpenApiTypes.STR,
+        location=OpenApiParameter.QUERY,
+        description="Comma-separated fields to leave out, e.g. `description,social_media`.",
+    ),
+]
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List all companies",
-        description="Retrieve a list of all companies along with their social media details.",
+        description=(
+            "Retrieve a cursor-paginated list of companies along with their social media details, "
+            "ordered by slug. Follow the `next` link to fetch the following page."
+        ),
         responses=CompanySerializer(many=True),
     ),
     retrieve=extend_schema(
@@ -52,7 +102,7 @@ from utils.tasks import send_registration_email
         responses=OpenApiResponse(description="Company deleted successfully."),
     ),
 )
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     ViewSet for CRUD operations on Company, including nested social media creation.
     """
@@ -60,18 +110,26 @@ class CompanyViewSet(viewsets.ModelViewSet):
     queryset = Company.objects.prefetch_related("social_media").all()
     serializer_class = CompanySerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
+    pagination_class = CompanyCursorPagination
     lookup_field = "slug"
+    cache_namespace = COMPANIES_CACHE_NAMESPACE
 
 
 @extend_schema_view(
     list=extend_schema(
         summary="List all events",
-        description="Retrieve a list of all events, including their social media details and organizers.",
-        responses=EventSerializer(many=True),
+        description=(
+            "Retrieve a cursor-paginated list of events in a compact representation, ordered by start date "
+            "(newest first) and start time. Follow the `next` link to fetch the following page. "
+            "Use `fields` to request other fields, e.g. `description` or `social_media`."
+        ),
+        parameters=SPARSE_FIELDSET_PARAMETERS,
+        responses=EventListSerializer(many=True),
     ),
     retrieve=extend_schema(
         summary="Retrieve a specific event",
         description="Get details of a specific event by its ID.",
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses=EventSerializer,
     ),
     create=extend_schema(
@@ -97,59 +155,297 @@ class CompanyViewSet(viewsets.ModelViewSet):
         description="Delete an existing event by its ID. Only the organizer or an admin can perform this action.",
         responses=OpenApiResponse(description="Event deleted successfully."),
     ),
+    search=extend_schema(
+        summary="Search events",
+        description=(
+            "Full-text search over event title, description, city, country and company name. "
+            "Results are ordered by relevance and cursor-paginated."
+        ),
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description='Search query, e.g. "python conference" or "kyiv -online".',
+            ),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        responses=EventListSerializer(many=True),
+    ),
+    facets=extend_schema(
+        summary="Event facet counts",
+        description=(
+            "Return the number of events per status, event type, delivery type, country and topic "
+            "for the current set of filters."
+        ),
+        responses=OpenApiTypes.OBJECT,
+    ),
 )
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalGetMixin, CachedResponseMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet for CRUD operations on Event, including nested social media creation.
     """
 
-    queryset = Event.objects.prefetch_related("social_media").all()
+    queryset = Event.objects.defer("search_vector").prefetch_related("social_media", "topics")
     serializer_class = EventSerializer
     permission_classes = [IsAuthenticated, IsEventOrganizerOrAdminUserOrReadOnly]
+    pagination_class = EventCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventFilter
     lookup_field = "id"
+    cache_namespace = EVENTS_CACHE_NAMESPACE
+    values_serializer_class = EventValuesSerializer
+    # Relations loaded with a separate query, only when their field is requested
+    prefetched_fields = ("social_media", "topics")
+
+    def get_serializer_class(self):
+        if self.action in ("list", "search"):
+            return EventListSerializer
+        return EventSerializer
+
+    def get_queryset(self):
+        """
+        Load only the columns and relations of the requested fields on read requests.
+        """
+        if self.action not in ("list", "retrieve", "search"):
+            return super().get_queryset()
+
+        serializer_class = self.get_serializer_class()
+        fields = serializer_class.get_requested_fields(self.request)
+        columns = serializer_class.get_model_field_names(fields)
+        if self.paginator is not None:
+            # The paginator reads the ordering fields of the last row to build the next cursor
+            columns += [field.lstrip("-") for field in self.paginator.ordering if field.lstrip("-") != "search_rank"]
+        prefetched_fields = [field for field in self.prefetched_fields if field in fields]
+        return Event.objects.only(*columns).prefetch_related(*prefetched_fields)
+
+    @action(detail=False, methods=["get"])
+    def search(self, request, *args, **kwargs):
+        """
+        Return events matching the `q` query parameter, most relevant first.
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            raise ValidationError({"q": "This query parameter is required."})
+
+        queryset = self.filter_queryset(self.get_queryset()).search(query)
+        if settings.API_VALUES_SERIALIZATION:
+            return self.get_values_list_response(queryset)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request, *args, **kwargs):
+        """
+        Return facet counts for the filtered events, cached per filter signature.
+        """
+        filter_params = sorted(
+            (key, value)
+            for key in request.query_params
+            if key not in ("cursor", "page_size", "format")
+            for value in request.query_params.getlist(key)
+        )
+        cache_key = make_cache_key(EVENT_FACETS_CACHE_NAMESPACE, *filter_params)
+        facets = cache.get(cache_key)
+        if facets is None:
+            facets = self.filter_queryset(Event.objects.all()).facet_counts()
+            cache.set(cache_key, facets, settings.EVENT_FACETS_CACHE_TIMEOUT)
+        return Response(facets)
+
+
+@extend_schema(
+    summary="Import events",
+    description=(
+        "Imports events, with their topics and social media links, from a CSV or NDJSON file. Rows are validated "
+        "and inserted in chunks; invalid rows are skipped and reported with their errors. Admins only."
+    ),
+    request={
+        "multipart/form-data": {
+            "type": "object",
+            "properties": {
+                "file": {"type": "string", "format": "binary"},
+                "format": {"type": "string", "enum": ["csv", "ndjson"]},
+            },
+            "required": ["file"],
+        }
+    },
+    responses=OpenApiTypes.OBJECT,
+)
+class EventImportView(APIView):
+    """
+    View to import events from a file.
+    """
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            raise ValidationError({"file": "No file was submitted."})
+        import_format = request.data.get("format") or get_import_format(upload.name)
+        if import_format not in ROW_READERS:
+            raise ValidationError({"format": "Use a .csv or .ndjson file, or set the format to `csv` or `ndjson`."})
+
+        # The upload is read as text one chunk of rows at a time, never loaded as a whole
+        stream = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="")
+        report = EventImporter().run(stream, import_format)
+        return Response(report, status=status.HTTP_201_CREATED if report["imported"] else status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Response cache statistics",
+    description="Returns the shared hit/miss counters of the event and company response caches. Admins only.",
+    responses=OpenApiTypes.OBJECT,
+)
+class ResponseCacheStatsView(APIView):
+    """
+    View to inspect the effectiveness of the response cache.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_response_cache_stats([EVENTS_CACHE_NAMESPACE, COMPANIES_CACHE_NAMESPACE]))
 
 
 @extend_schema(
     summary="List all event registrations",
-    description="Returns a list of event registrations based on the user's role. Admins see all registrations, participants see their own, and organizers see registrations for their events.",
-    responses=EventRegistrationSerializer(many=True),
+    description=(
+        "Returns a page of event registrations based on the user's role, newest first. Admins see all registrations, "
+        "participants see their own, and organizers see registrations for their events. With `stream=1`, all the "
+        "matching registrations are streamed as one unpaginated JSON array instead."
+    ),
     parameters=[
         OpenApiParameter(
-            name="status",
-            type=OpenApiTypes.STR,
+            name="stream",
+            type=OpenApiTypes.BOOL,
             location=OpenApiParameter.QUERY,
-            description="Filter registrations by status (e.g., 'pending', 'approved').",
+            description="Stream all the matching registrations as a JSON array instead of returning a page.",
         )
     ],
+    responses=EventRegistrationSerializer(many=True),
 )
-class EventRegistrationListView(APIView):
+class EventRegistrationListView(ValuesListMixin, generics.ListAPIView):
     """
     View to list all the registrations based on user role.
     """
 
+    serializer_class = EventRegistrationSerializer
     permission_classes = [IsAuthenticated]
+    renderer_classes = [StreamingJSONRenderer, BrowsableAPIRenderer]
+    pagination_class = EventRegistrationCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = EventRegistrationFilter
 
-    def get(self, request, *args, **kwargs):
-        """
-        Return all registrations for the current user.
-        """
-        user = request.user
+    def get_queryset(self):
+        user = self.request.user
 
+        if getattr(self, "swagger_fake_view", False):
+            # Schema generation, with an anonymous user
+            return EventRegistration.objects.none()
         if user.is_superuser:
             # Superuser can view all registrations
-            registrations = EventRegistration.objects.all()
-        elif user.is_participant():
+            return EventRegistration.objects.all()
+        if user.is_participant():
             # Participant can only see their own registrations
-            registrations = EventRegistration.objects.filter(participant__user=user)
-        elif user.is_organizer():
-            # Organizer can view registrations for events they organize
-            events = Event.objects.filter(organizer__user=user)
-            registrations = EventRegistration.objects.filter(event__in=events)
+            return EventRegistration.objects.filter(participant=user.participant_profile)
+        if user.is_organizer():
+            # Organizer can view registrations for events they organize, joined instead of a subquery
+            return EventRegistration.objects.filter(event__organizer=user.organizer_profile)
+        return EventRegistration.objects.none()
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return a page of registrations, or stream all of them with `?stream=1`.
+        Streamed registrations are read with a server-side cursor and serialized one chunk of
+        `API_STREAMING_CHUNK_SIZE` rows at a time, so memory use doesn't grow with their number.
+        """
+        renderer = request.accepted_renderer
+        if request.query_params.get("stream") not in ("1", "true") or not isinstance(renderer, StreamingJSONRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).order_by(*self.pagination_class.ordering)
+        if settings.API_VALUES_SERIALIZATION:
+            serializer = self.values_serializer_class(
+                self.get_serializer_class(), context=self.get_serializer_context()
+            )
+            queryset = queryset.values(*serializer.get_columns())
         else:
-            registrations = EventRegistration.objects.none()
+            serializer = self.get_serializer(many=True)
+        return StreamingHttpResponse(
+            renderer.render_stream(iterate_representations(queryset, serializer.to_representation)),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
 
-        serializer = EventRegistrationSerializer(registrations, many=True, context={"request": request})
-        return Response(serializer.data)
+
+@extend_schema(
+    summary="Export event registrations",
+    description=(
+        "Streams the registrations of an event (participant email and name, status and timestamps) as CSV or "
+        "newline-delimited JSON, oldest first. Only the organizer of the event or an admin can export them."
+    ),
+    parameters=[
+        OpenApiParameter(
+            name="format",
+            type=OpenApiTypes.STR,
+            location=OpenApiParameter.QUERY,
+            enum=["csv", "ndjson"],
+            description="Export format, CSV by default.",
+        )
+    ],
+    responses={(200, "text/csv"): OpenApiTypes.STR, (200, "application/x-ndjson"): OpenApiTypes.STR},
+)
+class EventRegistrationExportView(APIView):
+    """
+    View to export the registrations of an event.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizerOrAdminUser]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+    # Exported columns and the registration fields they are read from
+    export_fields = {
+        "email": "participant__user__email",
+        "first_name": "participant__user__first_name",
+        "last_name": "participant__user__last_name",
+        "status": "status",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    datetime_field = serializers.DateTimeField()
+
+    def get(self, request, *args, **kwargs):
+        """
+        Stream the registrations of the event, reading them with a server-side cursor.
+        """
+        user = request.user
+        # Same scoping as `EventRegistrationListView`
+        events = Event.objects.all() if user.is_superuser else Event.objects.filter(organizer__user=user)
+        event = get_object_or_404(events.only("id", "slug"), id=kwargs["id"])
+
+        rows = (
+            event.registrations.order_by("created_at", "id")
+            .values_list(*self.export_fields.values())
+            .iterator(chunk_size=settings.API_STREAMING_CHUNK_SIZE)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.render_stream(map(self.get_item, rows), {"header": list(self.export_fields)}),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{event.slug}-registrations.{renderer.format}"'
+        return response
+
+    def get_item(self, row):
+        """
+        Return the exported representation of a registration row.
+        """
+        item = dict(zip(self.export_fields, row))
+        item["created_at"] = self.datetime_field.to_representation(item["created_at"])
+        item["updated_at"] = self.datetime_field.to_representation(item["updated_at"])
+        return item
 
 
 @extend_schema(
@@ -174,6 +470,87 @@ class EventRegistrationCreateView(APIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@extend_schema(
+    summary="Register many participants for an event",
+    description=(
+        "Registers up to 1000 participants for an event in one request. Confirmed registrations take the "
+        "free seats in the given order and the others are waitlisted. Returns one result per participant: "
+        "the created registration and its status, or why the participant was skipped. "
+        "Only the organizer of the event or an admin can perform this action."
+    ),
+    request=EventRegistrationBulkSerializer,
+    responses=OpenApiTypes.OBJECT,
+)
+class EventRegistrationBulkCreateView(APIView):
+    """
+    View to register many participants for an event at once.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizerOrAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = EventRegistrationBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        event = serializer.validated_data["event"]
+        if request.user.is_organizer() and event.organizer_id != request.user.organizer_profile.pk:
+            return Response(
+                {"detail": "You cannot register participants for this event."}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        results = EventRegistration.objects.bulk_register(
+            event.pk, serializer.validated_data["participants"], serializer.validated_data["status"]
+        )
+        registration_ids = [str(result["registration"]) for result in results if "registration" in result]
+        if registration_ids:
+            transaction.on_commit(lambda: send_bulk_registration_emails.delay(registration_ids))
+
+        summary = {
+            "registered": len(registration_ids),
+            "skipped": len(results) - len(registration_ids),
+            "results": results,
+        }
+        return Response(summary, status=status.HTTP_201_CREATED if registration_ids else status.HTTP_200_OK)
+
+
+@extend_schema(
+    summary="Change the status of many registrations",
+    description=(
+        "Changes the status of the registrations listed in `ids`, or of all registrations of `event` "
+        "(optionally only those in `current_status`), in a single update. Confirmed registrations only get "
+        "the free seats of their event, oldest first, and the others are waitlisted. "
+        "Organizers can only change registrations of their own events."
+    ),
+    request=EventRegistrationBulkStatusSerializer,
+    responses=OpenApiTypes.OBJECT,
+)
+class EventRegistrationBulkStatusView(APIView):
+    """
+    View to change the status of many registrations at once.
+    """
+
+    permission_classes = [IsAuthenticated, IsOrganizerOrAdminUser]
+
+    def post(self, request, *args, **kwargs):
+        serializer = EventRegistrationBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        registrations = EventRegistration.objects.all()
+        if request.user.is_organizer():
+            registrations = registrations.filter(event__organizer=request.user.organizer_profile)
+        if "ids" in data:
+            registrations = registrations.filter(pk__in=data["ids"])
+        if "event" in data:
+            registrations = registrations.filter(event_id=data["event"])
+        if "current_status" in data:
+            registrations = registrations.filter(status=data["current_status"])
+
+        summary = registrations.bulk_update_status(data["status"])
+        if "ids" in data:
+            summary["not_found"] = len(set(data["ids"])) - summary["matched"]
+        return Response(summary, status=status.HTTP_200_OK)
+
+
 @extend_schema(
     summary="Update an event registration",
     description="Update the details of an existing event registration. Only the organizer or an admin can perform this action.",
@@ -193,7 +570,7 @@ class EventRegistrationUpdateView(APIView):
             registration = EventRegistration.objects.get(id=registration_id)
         except EventRegistration.DoesNotExist:
             raise ValidationError("Registration not found.")
-        if request.user.is_organizer() and registration.event.organizer.user != request.user:
+        if request.user.is_organizer() and registration.event.organizer_id != request.user.organizer_profile.pk:
             return Response(
                 {"detail": "You cannot modify registrations for this event."}, status=status.HTTP_403_FORBIDDEN
             )
@@ -0,0 +1,176 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from events.api.serializers import EventImportSerializer
+from events.models import Company, Event, EventSocialMedia, EventTopic, Topic
+from events.signals import EVENT_FACETS_CACHE_NAMESPACE, invalidate_event_responses
+from users.models import Organizer
+from utils.cache import invalidate_cache_namespace
+
+# Supported import formats, by file extension
+IMPORT_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+# Maximum number of row errors kept in an import report
+MAX_REPORTED_ERRORS = 1000
+
+# CSV columns holding the url of a social media platform, e.g. `telegram`
+SOCIAL_MEDIA_PLATFORMS = [platform for platform, _ in EventSocialMedia._meta.get_field("platform").choices]
+
+
+def get_import_format(filename: str):
+    """
+    Return the import format matching the extension of a file name, if any.
+    """
+    return IMPORT_FORMATS.get(os.path.splitext(filename)[1].lower())
+
+
+def read_csv_rows(stream):
+    """
+    Yield the `(row number, row)` pairs of a CSV text stream with a header row.
+
+    Empty cells are left out, `topics` holds comma-separated topic ids and the social media
+    links are given in one column per platform (`telegram`, `facebook`...).
+    """
+    for number, record in enumerate(csv.DictReader(stream), start=1):
+        row = {column: value for column, value in record.items() if column and value not in ("", None)}
+        if "topics" in row:
+            row["topics"] = [topic_id.strip() for topic_id in row["topics"].split(",") if topic_id.strip()]
+        row["social_media"] = [
+            {"platform": platform, "url": row.pop(platform)} for platform in SOCIAL_MEDIA_PLATFORMS if platform in row
+        ]
+        yield number, row
+
+
+def read_ndjson_rows(stream):
+    """
+    Yield the `(row number, row)` pairs of a newline-delimited JSON text stream, one event object per line.
+    Lines which are not a JSON object are yielded as their error message.
+    """
+    number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f"Invalid JSON: {exc}."
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object."
+
+
+ROW_READERS = {"csv": read_csv_rows, "ndjson": read_ndjson_rows}
+
+
+class EventImporter:
+    """
+    Import events, with their topics and social media links, from a CSV or NDJSON text stream.
+
+    The stream is read and imported one chunk of `EVENT_IMPORT_CHUNK_SIZE` rows at a time: the rows are
+    validated with `EventImportSerializer`, their companies and organizers are looked up with one query
+    per chunk, and the events, their topics and links are inserted with one `bulk_create` each.
+    Invalid rows are skipped and reported with their errors, the other rows are imported. A chunk rejected
+    by the database is rolled back and reported against each of its rows.
+    """
+
+    def __init__(self, chunk_size=None):
+        self.chunk_size = chunk_size or settings.EVENT_IMPORT_CHUNK_SIZE
+        self.serializer = EventImportSerializer()
+        self.topic_ids = None
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def run(self, stream, import_format) -> dict:
+        """
+        Import the events of the stream and return the import report.
+        """
+        rows = ROW_READERS[import_format](stream)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self.import_chunk(chunk)
+        if self.imported:
+            invalidate_event_responses()
+            invalidate_cache_namespace(EVENT_FACETS_CACHE_NAMESPACE)
+        errors = sorted(self.errors, key=lambda error: error["row"])
+        return {"imported": self.imported, "failed": self.failed, "errors": errors}
+
+    def add_error(self, number, errors):
+        """
+        Record an invalid row, keeping the errors of the first `MAX_REPORTED_ERRORS` ones.
+        """
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "errors": errors})
+
+    def validate_chunk(self, chunk) -> list:
+        """
+        Return the `(row number, validated data)` pairs of the valid rows of a chunk.
+        """
+        rows = []
+        for number, row in chunk:
+            if not isinstance(row, dict):
+                self.add_error(number, {"non_field_errors": [row]})
+                continue
+            try:
+                rows.append((number, self.serializer.run_validation(row)))
+            except ValidationError as exc:
+                self.add_error(number, exc.detail)
+        return rows
+
+    def import_chunk(self, chunk):
+        """
+        Validate a chunk of rows and insert its valid events.
+        """
+        rows = self.validate_chunk(chunk)
+        if self.topic_ids is None:
+            self.topic_ids = set(Topic.objects.values_list("pk", flat=True))
+        company_ids = set(
+            Company.objects.filter(pk__in={data["company"] for _, data in rows}).values_list("pk", flat=True)
+        )
+        organizer_ids = set(
+            Organizer.objects.filter(pk__in={data["organizer"] for _, data in rows}).values_list("pk", flat=True)
+        )
+
+        numbers, events, event_topics, social_media = [], [], [], []
+        for number, data in rows:
+            errors = {}
+            if data["company"] not in company_ids:
+                errors["company"] = [f"Company {data['company']} does not exist."]
+            if data["organizer"] not in organizer_ids:
+                errors["organizer"] = [f"Organizer {data['organizer']} does not exist."]
+            unknown_topics = sorted(set(data["topics"]) - self.topic_ids)
+            if unknown_topics:
+                errors["topics"] = [f"Topics {', '.join(map(str, unknown_topics))} do not exist."]
+            if errors:
+                self.add_error(number, errors)
+                continue
+
+            topic_ids = data.pop("topics")
+            links = data.pop("social_media")
+            event = Event(company_id=data.pop("company"), organizer_id=data.pop("organizer"), **data)
+            numbers.append(number)
+            events.append(event)
+            event_topics.extend(EventTopic(event=event, topic_id=topic_id) for topic_id in dict.fromkeys(topic_ids))
+            social_media.extend(EventSocialMedia(event=event, **link) for link in links)
+
+        if not events:
+            return
+        try:
+            with transaction.atomic():
+                # Slugs are generated by `EventQuerySet.bulk_create`, with one query for the chunk
+                Event.objects.bulk_create(events)
+                EventTopic.objects.bulk_create(event_topics)
+                EventSocialMedia.objects.bulk_create(social_media)
+                Event.objects.filter(pk__in=[event.pk for event in events]).update_search_vector()
+        except IntegrityError as exc:
+            # A constraint the validation does not cover rolled the chunk back, the other chunks are still imported
+            for number in numbers:
+                self.add_error(number, {"non_field_errors": [f"The chunk of this row could not be imported: {exc}"]})
+            return
+        self.imported += len(events)
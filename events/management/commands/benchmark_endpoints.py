@@ -0,0 +1,499 @@
+import io
+import json
+import math
+import statistics
+import time
+import tracemalloc
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from config.celery import app as celery_app
+from events.models import Company, Event, EventRegistration, Topic
+from users.api.serializers import TokenObtainPairSerializer
+from users.models import Organizer, Participant, User
+from utils.choices import DeliveryType, EventRegistrationStatus, EventStatus, EventType
+
+# Budgets of every endpoint case, one section per database vendor
+BUDGETS_PATH = settings.BASE_DIR / "config" / "benchmark_budgets.json"
+# Password of the users created by `generate_dataset`
+DATASET_PASSWORD = "StrongPassword123!"
+# Headroom given to the measured latency and memory when recording budgets, query counts are recorded as is
+LATENCY_MARGIN = 3
+MEMORY_MARGIN = 2
+# Lowest latency budget, below it the timings are mostly noise
+MIN_LATENCY_BUDGET_MS = 50
+# Number of participants registered or registrations updated by one bulk request
+BULK_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Load a generated dataset into a test database, request every API endpoint and report its latency "
+        "percentiles, query count and peak memory, failing if it exceeds its budget in config/benchmark_budgets.json"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Number of measured requests per endpoint")
+        parser.add_argument("--warmup", type=int, default=3, help="Number of unmeasured requests per endpoint")
+        parser.add_argument("--participants", type=int, default=2000, help="Number of participants of the dataset")
+        parser.add_argument("--events", type=int, default=1000, help="Number of events of the dataset")
+        parser.add_argument(
+            "--registrations", type=int, default=20000, help="Approximate number of registrations of the dataset"
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Seed of the dataset")
+        parser.add_argument("--only", nargs="+", metavar="CASE", help="Only benchmark the given endpoint cases")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database and its dataset between runs")
+        parser.add_argument(
+            "--update-budgets",
+            action="store_true",
+            help="Record the measured values as the budgets of the current database vendor instead of checking them",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 2:
+            raise CommandError("At least 2 iterations are required to compute percentiles.")
+
+        setup_test_environment()
+        old_database_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        # Emails sent by the tasks go to the local memory backend of the test environment
+        always_eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        try:
+            if Event.objects.exists():
+                self.stdout.write("Reusing the dataset of the test database.")
+            else:
+                call_command(
+                    "generate_dataset",
+                    participants=options["participants"],
+                    organizers=max(options["participants"] // 100, 1),
+                    companies=max(options["events"] // 20, 1),
+                    events=options["events"],
+                    registrations=options["registrations"],
+                    seed=options["seed"],
+                    stdout=self.stdout,
+                )
+            results = self.run_cases(options)
+        finally:
+            celery_app.conf.task_always_eager = always_eager
+            connection.creation.destroy_test_db(old_database_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        if options["update_budgets"]:
+            self.update_budgets(results)
+        else:
+            self.check_budgets(results)
+
+    def run_cases(self, options) -> dict:
+        """
+        Measure every endpoint case and return the results by case name.
+        """
+        count = options["warmup"] + options["iterations"] + 1
+        cases = self.get_cases(count)
+        if options["only"]:
+            unknown_cases = set(options["only"]) - {name for name, *_ in cases}
+            if unknown_cases:
+                raise CommandError(f"Unknown endpoint cases: {', '.join(sorted(unknown_cases))}.")
+            cases = [case for case in cases if case[0] in options["only"]]
+
+        client = Client()
+        self.tokens = {}
+        results = {}
+        self.stdout.write(f"{'endpoint':<30} {'p50':>9} {'p95':>9} {'queries':>8} {'peak memory':>12}")
+        for name, method, build_request, multipart in cases:
+            timings = []
+            query_counts = []
+            for iteration in range(options["warmup"] + options["iterations"]):
+                elapsed, query_count = self.send(client, name, method, build_request(iteration), multipart)
+                if iteration >= options["warmup"]:
+                    timings.append(elapsed)
+                    query_counts.append(query_count)
+
+            tracemalloc.start()
+            try:
+                self.send(client, name, method, build_request(count - 1), multipart)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+            results[name] = {
+                "p50_ms": round(1000 * percentiles[49], 2),
+                "p95_ms": round(1000 * percentiles[94], 2),
+                "queries": max(query_counts),
+                "peak_memory_kib": math.ceil(peak / 1024),
+            }
+            result = results[name]
+            self.stdout.write(
+                f"{name:<30} {result['p50_ms']:>7.2f}ms {result['p95_ms']:>7.2f}ms {result['queries']:>8} "
+                f"{result['peak_memory_kib']:>8} KiB"
+            )
+        return results
+
+    def send(self, client, name, method, request, multipart) -> tuple:
+        """
+        Send a request with an empty cache and return its duration, response included, and its query count.
+        """
+        user, path, data = request
+        headers = {}
+        if user is not None:
+            if user.pk not in self.tokens:
+                self.tokens[user.pk] = f"Bearer {TokenObtainPairSerializer.get_token(user).access_token}"
+            headers["HTTP_AUTHORIZATION"] = self.tokens[user.pk]
+        if method == "get" or multipart:
+            kwargs = {"path": path, "data": data}
+        else:
+            kwargs = {"path": path, "data": json.dumps(data), "content_type": "application/json"}
+
+        # Cached responses would hide the queries of the view
+        cache.clear()
+        # The query log is bounded, counting from a full log would always give 0
+        reset_queries()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = getattr(client, method)(**kwargs, **headers)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(f"{name}: {method.upper()} {path} returned {response.status_code}: {response.content!r}")
+        return elapsed, len(context)
+
+    def get_cases(self, count) -> list:
+        """
+        Return the endpoint cases as `(name, method, build_request, multipart)`.
+
+        `build_request(iteration)` returns the `(user, path, data)` of a request, requests which create or
+        delete data use different objects at every iteration, `count` being the number of iterations.
+        """
+        run = uuid.uuid4().hex[:8]
+        topic_ids = list(Topic.objects.values_list("pk", flat=True)[:3])
+        admin = User.objects.create_superuser(
+            email=f"benchmark-{run}@example.com", password=DATASET_PASSWORD, phone=f"+benchmark-{run}"
+        )
+        organizer = (
+            Organizer.objects.select_related("user")
+            .annotate(registrations=Count("events__registrations"))
+            .latest("registrations")
+        )
+        events = list(Event.objects.filter(organizer=organizer).order_by("-confirmed_count", "id")[:count])
+        event = events[0]
+        company = event.company
+        participant = Participant.objects.filter(registrations__isnull=False).select_related("user").first()
+        registrations = list(
+            EventRegistration.objects.filter(event__organizer=organizer)
+            .order_by("id")
+            .values_list("id", "participant_id", "event_id")[: count * (BULK_SIZE + 1)]
+        )
+        if len(registrations) < count * (BULK_SIZE + 1):
+            raise CommandError("The dataset is too small for the number of iterations, generate more registrations.")
+        # Participants registered one at a time for a new event, or in bulk for other new events
+        participants = list(Participant.objects.select_related("user").order_by("id")[: count * BULK_SIZE])
+        if len(participants) < count * BULK_SIZE:
+            raise CommandError("The dataset is too small for the number of iterations, generate more participants.")
+        registration_event, *bulk_events = self.create_events(organizer, company, count + 1, run)
+        disposable_events = self.create_events(organizer, company, count, run)
+        disposable_companies = Company.objects.bulk_create(
+            [Company(name=f"Benchmark {run} {index}", description="Benchmark") for index in range(count)]
+        )
+
+        def event_data(index):
+            start_date = timezone.now().date() + timedelta(days=30)
+            return {
+                "title": f"Benchmark {run} {index}",
+                "description": "Benchmark event",
+                "event_start_time": "10:00",
+                "event_start_date": start_date.isoformat(),
+                "event_end_date": start_date.isoformat(),
+                "city": event.city,
+                "country": event.country,
+                "location": "Main hall",
+                "capacity": 100,
+                "delivery_type": DeliveryType.OFFLINE,
+                "status": EventStatus.UPCOMING,
+                "event_type": EventType.CONFERENCE,
+                "topics": topic_ids,
+                "company": str(company.pk),
+                "social_media": [{"platform": "telegram", "url": "https://t.me/benchmark"}],
+            }
+
+        def user_data(index):
+            return {
+                "email": f"benchmark-{run}-{index}@example.com",
+                "password": DATASET_PASSWORD,
+                "confirm_password": DATASET_PASSWORD,
+                "first_name": "Bench",
+                "last_name": "Mark",
+                "phone": f"+benchmark-{run}-{index}",
+            }
+
+        def import_data(index):
+            row = {**event_data(index), "organizer": organizer.pk}
+            upload = io.BytesIO(
+                "\n".join(json.dumps({**row, "title": f"{row['title']} {n}"}) for n in range(10)).encode()
+            )
+            upload.name = "events.ndjson"
+            return {"file": upload}
+
+        return [
+            ("event_list", "get", lambda i: (participant.user, reverse("event_list"), {}), False),
+            (
+                "event_list_filtered",
+                "get",
+                lambda i: (
+                    participant.user,
+                    reverse("event_list"),
+                    {"status": EventStatus.UPCOMING, "topics": topic_ids[0]},
+                ),
+                False,
+            ),
+            (
+                "event_search",
+                "get",
+                lambda i: (participant.user, reverse("event_search"), {"q": event.title.split()[0]}),
+                False,
+            ),
+            ("event_facets", "get", lambda i: (participant.user, reverse("event_facets"), {}), False),
+            (
+                "event_detail",
+                "get",
+                lambda i: (participant.user, reverse("event_detail", args=[events[i % len(events)].pk]), {}),
+                False,
+            ),
+            ("event_create", "post", lambda i: (organizer.user, reverse("event_create"), event_data(i)), False),
+            (
+                "event_update",
+                "patch",
+                lambda i: (
+                    organizer.user,
+                    reverse("event_detail", args=[events[i % len(events)].pk]),
+                    {"capacity": 1000 + i},
+                ),
+                False,
+            ),
+            (
+                "event_delete",
+                "delete",
+                lambda i: (organizer.user, reverse("event_detail", args=[disposable_events[i].pk]), {}),
+                False,
+            ),
+            ("event_import", "post", lambda i: (admin, reverse("event_import"), import_data(i)), True),
+            (
+                "event_registrations_export",
+                "get",
+                lambda i: (organizer.user, reverse("event_registrations_export", args=[event.pk]), {"format": "csv"}),
+                False,
+            ),
+            ("companies_list", "get", lambda i: (participant.user, reverse("companies_list"), {}), False),
+            (
+                "company_detail",
+                "get",
+                lambda i: (participant.user, reverse("company_detail", args=[company.slug]), {}),
+                False,
+            ),
+            (
+                "company_create",
+                "post",
+                lambda i: (
+                    admin,
+                    reverse("company_create"),
+                    {"name": f"Benchmark {run} {i}", "description": "Benchmark", "website_url": "https://example.com"},
+                ),
+                False,
+            ),
+            (
+                "company_update",
+                "patch",
+                lambda i: (admin, reverse("company_detail", args=[company.slug]), {"description": f"Benchmark {i}"}),
+                False,
+            ),
+            (
+                "company_delete",
+                "delete",
+                lambda i: (admin, reverse("company_detail", args=[disposable_companies[i].slug]), {}),
+                False,
+            ),
+            ("response_cache_stats", "get", lambda i: (admin, reverse("response_cache_stats"), {}), False),
+            (
+                "registrations_list_participant",
+                "get",
+                lambda i: (participant.user, reverse("event_registrations_list"), {}),
+                False,
+            ),
+            (
+                "registrations_list_organizer",
+                "get",
+                lambda i: (organizer.user, reverse("event_registrations_list"), {"event": event.pk}),
+                False,
+            ),
+            (
+                "registration_create",
+                "post",
+                lambda i: (
+                    participants[i].user,
+                    reverse("event_registrations_create"),
+                    {"event": str(registration_event.pk)},
+                ),
+                False,
+            ),
+            (
+                "registration_bulk_create",
+                "post",
+                lambda i: (
+                    organizer.user,
+                    reverse("event_registrations_bulk_create"),
+                    {
+                        "event": str(bulk_events[i].pk),
+                        "participants": [p.pk for p in participants[i * BULK_SIZE : (i + 1) * BULK_SIZE]],
+                    },
+                ),
+                False,
+            ),
+            (
+                "registration_bulk_status",
+                "post",
+                lambda i: (
+                    organizer.user,
+                    reverse("event_registrations_bulk_status"),
+                    {
+                        "status": EventRegistrationStatus.CANCELLED,
+                        "ids": [
+                            str(pk) for pk, *_ in registrations[count + i * BULK_SIZE : count + (i + 1) * BULK_SIZE]
+                        ],
+                    },
+                ),
+                False,
+            ),
+            (
+                "registration_update",
+                "put",
+                lambda i: (
+                    organizer.user,
+                    reverse("event_registration_update", args=[registrations[i][0]]),
+                    {
+                        "participant": registrations[i][1],
+                        "event": str(registrations[i][2]),
+                        "status": EventRegistrationStatus.CONFIRMED,
+                    },
+                ),
+                False,
+            ),
+            (
+                "sign_up",
+                "post",
+                lambda i: (None, reverse("create_account"), {**user_data(i), "interests": topic_ids}),
+                False,
+            ),
+            (
+                "login",
+                "post",
+                lambda i: (
+                    None,
+                    reverse("token_obtain_pair"),
+                    {"email": participant.user.email, "password": DATASET_PASSWORD},
+                ),
+                False,
+            ),
+            (
+                "login_refresh",
+                "post",
+                lambda i: (
+                    None,
+                    reverse("token_refresh"),
+                    {"refresh": str(TokenObtainPairSerializer.get_token(participant.user))},
+                ),
+                False,
+            ),
+            (
+                "organizer_create",
+                "post",
+                lambda i: (
+                    admin,
+                    reverse("create_organizer"),
+                    {**user_data(count + i), "bio": "Benchmark", "city": event.city, "country": event.country},
+                ),
+                False,
+            ),
+        ]
+
+    @staticmethod
+    def create_events(organizer, company, count, run) -> list:
+        """
+        Create upcoming events without registrations, for the requests which need a different event every time.
+        """
+        start_date = timezone.now().date() + timedelta(days=30)
+        return Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Benchmark {run} {index}",
+                    description="Benchmark event",
+                    event_start_time="10:00",
+                    event_start_date=start_date,
+                    location="Main hall",
+                    capacity=BULK_SIZE * 2,
+                    delivery_type=DeliveryType.OFFLINE,
+                    status=EventStatus.UPCOMING,
+                    event_type=EventType.CONFERENCE,
+                    company=company,
+                    organizer=organizer,
+                )
+                for index in range(count)
+            ]
+        )
+
+    @staticmethod
+    def load_budgets() -> dict:
+        if not BUDGETS_PATH.exists():
+            return {}
+        return json.loads(BUDGETS_PATH.read_text())
+
+    def update_budgets(self, results):
+        """
+        Record the results as the budgets of the current database vendor, with some headroom for noise.
+        """
+        budgets = self.load_budgets()
+        budgets[connection.vendor] = {
+            name: {
+                "queries": result["queries"],
+                "p95_ms": max(math.ceil(result["p95_ms"] * LATENCY_MARGIN), MIN_LATENCY_BUDGET_MS),
+                "peak_memory_kib": math.ceil(result["peak_memory_kib"] * MEMORY_MARGIN),
+            }
+            for name, result in results.items()
+        }
+        BUDGETS_PATH.write_text(json.dumps(budgets, indent=2, sort_keys=True) + "\n")
+        self.stdout.write(self.style.SUCCESS(f"Budgets of {connection.vendor} written to {BUDGETS_PATH}."))
+
+    def check_budgets(self, results):
+        """
+        Compare the results with the budgets of the current database vendor and fail on any regression.
+        """
+        budgets = self.load_budgets().get(connection.vendor)
+        if budgets is None:
+            raise CommandError(f"No budgets recorded for {connection.vendor}, record them with --update-budgets.")
+
+        failures = []
+        for name, result in results.items():
+            budget = budgets.get(name)
+            if budget is None:
+                self.stdout.write(self.style.WARNING(f"{name}: no budget, record it with --update-budgets."))
+                continue
+            for metric, unit in (("queries", " queries"), ("p95_ms", "ms"), ("peak_memory_kib", " KiB")):
+                if result[metric] > budget[metric]:
+                    failures.append(
+                        f"{name}: {metric} {result[metric]}{unit} exceeds the budget of {budget[metric]}{unit}"
+                    )
+        if failures:
+            raise CommandError("Endpoint budgets exceeded:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All endpoints are within their budgets."))
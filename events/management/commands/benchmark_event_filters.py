@@ -0,0 +1,111 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+
+from events.api.filters import EventFilter
+from events.api.pagination import EventCursorPagination
+from events.models import Event, EventTopic
+
+# Filter combinations exercised by the benchmark, as query strings of the event list endpoint
+FILTER_CASES = [
+    "status=UPCOMING",
+    "event_type=CONFERENCE",
+    "delivery_type=ONLINE",
+    "country={country}",
+    "country={country}&city={city}",
+    "city={city}",
+    "company={company}",
+    "organizer={organizer}",
+    "topics={topic}",
+    "topics={topic},{other_topic}&topics_match=all",
+    "start_date_after={date}&start_date_before={date}",
+    "status=UPCOMING&event_type=CONFERENCE&delivery_type=ONLINE",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every event list filter against the current database, report its latency and query plan, "
+        "and flag filters that fall back to a sequential scan of the events table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Number of runs per filter")
+        parser.add_argument("--page-size", type=int, default=50, help="Number of events fetched per query")
+        parser.add_argument("--strict", action="store_true", help="Fail if any filter uses a sequential scan")
+
+    def handle(self, *args, **options):
+        sample = Event.objects.order_by().values("city", "country", "company_id", "organizer_id", "event_start_date")
+        sample = sample.first()
+        topics = list(EventTopic.objects.order_by().values_list("topic_id", flat=True).distinct()[:2])
+        if not sample or len(topics) < 2:
+            raise CommandError("Generate some events with topics before running the benchmark.")
+
+        context = {
+            "city": sample["city"],
+            "country": sample["country"],
+            "company": sample["company_id"],
+            "organizer": sample["organizer_id"],
+            "date": sample["event_start_date"],
+            "topic": topics[0],
+            "other_topic": topics[1],
+        }
+        ordering = EventCursorPagination.ordering
+        self.stdout.write(f"Benchmarking event filters over {Event.objects.count()} events...")
+
+        sequential_scans = []
+        for case in FILTER_CASES:
+            query_string = case.format(**context)
+            filterset = EventFilter(QueryDict(query_string), queryset=Event.objects.defer("search_vector"))
+            if not filterset.is_valid():
+                raise CommandError(f"Invalid filter {query_string}: {filterset.errors}")
+            queryset = filterset.qs.order_by(*ordering)[: options["page_size"]]
+
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+
+            plan = self.explain(queryset)
+            uses_sequential_scan = self.uses_sequential_scan(plan)
+            if uses_sequential_scan:
+                sequential_scans.append(query_string)
+            self.stdout.write(
+                f"{query_string:<60} best={1000 * min(timings):7.2f}ms "
+                f"median={1000 * sorted(timings)[len(timings) // 2]:7.2f}ms "
+                f"{'SEQ SCAN' if uses_sequential_scan else 'index'}"
+            )
+            if options["verbosity"] > 1:
+                self.stdout.write(plan)
+
+        if sequential_scans:
+            message = (
+                f"{len(sequential_scans)} filters scan the events table sequentially: {', '.join(sequential_scans)}"
+            )
+            if options["strict"]:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS("All filters are served from indexes."))
+
+    @staticmethod
+    def explain(queryset):
+        """
+        Return the query plan, with actual timings on PostgreSQL.
+        """
+        if connection.vendor == "postgresql":
+            return queryset.explain(analyze=True, buffers=True)
+        return queryset.explain()
+
+    @staticmethod
+    def uses_sequential_scan(plan):
+        """
+        Return True if the plan reads the whole events table.
+        """
+        table = Event._meta.db_table
+        if connection.vendor == "postgresql":
+            return f"Seq Scan on {table}" in plan
+        return any(f"SCAN {table}" in line and "USING" not in line for line in plan.splitlines())
@@ -0,0 +1,92 @@
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from events.api.serializers import (
+    EventListSerializer,
+    EventRegistrationSerializer,
+    EventSerializer,
+    EventValuesSerializer,
+)
+from events.models import Event, EventRegistration
+from users.models import User
+from utils.values import ValuesSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput and peak memory of the DRF serializers with the `.values()` read path "
+        "(API_VALUES_SERIALIZATION) on the event and registration lists, and check both render the same JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000, help="Number of rows serialized per run")
+        parser.add_argument("--repeat", type=int, default=3, help="Number of runs per path")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        request = Request(RequestFactory().get("/api/events/"))
+        # An unsaved staff user has no organizer or participant profile, so every field is serialized
+        request.user = User(is_staff=True)
+        context = {"request": request}
+
+        events = Event.objects.defer("search_vector").order_by("-event_start_date", "event_start_time", "id")[:rows]
+        registrations = EventRegistration.objects.order_by("-created_at", "id")[:rows]
+        cases = [
+            ("event list", EventListSerializer, EventValuesSerializer, events),
+            ("event detail", EventSerializer, EventValuesSerializer, events),
+            ("registrations", EventRegistrationSerializer, ValuesSerializer, registrations),
+        ]
+        for name, serializer_class, values_serializer_class, queryset in cases:
+            count = queryset.count()
+            if count < rows:
+                self.stdout.write(self.style.WARNING(f"{name}: only {count} rows available, generate more data."))
+            if not count:
+                continue
+
+            def serialize_instances():
+                return serializer_class(
+                    queryset.prefetch_related("social_media", "topics") if queryset.model is Event else queryset,
+                    many=True,
+                    context=context,
+                ).data
+
+            def serialize_values():
+                serializer = values_serializer_class(serializer_class, context=context)
+                return serializer.to_representation(queryset.values(*serializer.get_columns()))
+
+            instances_json, instances_time, instances_memory = self.measure(serialize_instances, options["repeat"])
+            values_json, values_time, values_memory = self.measure(serialize_values, options["repeat"])
+            if instances_json != values_json:
+                raise CommandError(f"{name}: the `.values()` read path renders different JSON.")
+
+            self.stdout.write(
+                f"{name:<14} {count} rows | serializer {count / instances_time:9.0f} rows/s "
+                f"peak {instances_memory / 2**20:7.1f} MiB | values {count / values_time:9.0f} rows/s "
+                f"peak {values_memory / 2**20:7.1f} MiB | x{instances_time / values_time:.1f} faster"
+            )
+        self.stdout.write(self.style.SUCCESS("Both paths render identical JSON."))
+
+    @staticmethod
+    def measure(serialize, repeat):
+        """
+        Return the rendered JSON, the best time and the peak memory of a serialization run, queries included.
+        """
+        renderer = JSONRenderer()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serialize()
+            timings.append(time.perf_counter() - started)
+
+        tracemalloc.start()
+        try:
+            content = renderer.render(serialize())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return content, min(timings), peak
@@ -0,0 +1,350 @@
+import multiprocessing
+import random
+import time
+import uuid
+from datetime import time as datetime_time, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from faker import Faker
+
+from events.models import Company, Event, EventRegistration, EventTopic, Topic
+from events.signals import EVENT_FACETS_CACHE_NAMESPACE, invalidate_event_responses
+from users.models import Organizer, Participant, User
+from utils.cache import invalidate_cache_namespace
+from utils.choices import DeliveryType, EventRegistrationStatus, EventStatus, EventType
+
+# Same status distribution as `create_event_registrations`
+REGISTRATION_STATUSES = list(EventRegistrationStatus.values)
+REGISTRATION_STATUS_CUM_WEIGHTS = list(accumulate([70, 20, 5, 3, 2]))
+# Number of distinct cities events take place in
+CITY_COUNT = 200
+
+# Participant ids of the registration workers, set once per process by `init_registration_worker`
+_participant_ids = []
+
+
+def zipf_weights(count, exponent, rng) -> list:
+    """
+    Return Zipf-like weights for `count` items (the n-th most popular item weighs 1 / n ** exponent),
+    shuffled so the popular items are spread randomly.
+    """
+    weights = [1 / rank**exponent for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return weights
+
+
+def random_uuid(rng) -> uuid.UUID:
+    """
+    Return a version 4 UUID drawn from `rng`, so the generated primary keys are reproducible.
+    """
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def init_registration_worker(participant_ids):
+    """
+    Pool initializer storing the participant ids once per worker instead of sending them with every task.
+    """
+    global _participant_ids
+    _participant_ids = participant_ids
+
+
+def create_registrations(task) -> int:
+    """
+    Insert the registrations of a group of events and return their number.
+
+    Each event draws its participants without replacement from its own random generator seeded with the
+    event id, so the pairs are unique without any lookup and the data doesn't depend on the number of
+    workers. Confirmed registrations above the capacity of the event are put on the waitlist.
+    """
+    events, seed, batch_size, now = task
+    registrations = []
+    created = 0
+    for event_id, count, capacity in events:
+        rng = random.Random(f"{seed}:{event_id}")
+        confirmed = 0
+        for participant_id in rng.sample(_participant_ids, count):
+            status = rng.choices(REGISTRATION_STATUSES, cum_weights=REGISTRATION_STATUS_CUM_WEIGHTS)[0]
+            if status == EventRegistrationStatus.CONFIRMED:
+                if capacity is not None and confirmed >= capacity:
+                    status = EventRegistrationStatus.WAITLIST
+                else:
+                    confirmed += 1
+            registrations.append(
+                EventRegistration(
+                    id=random_uuid(rng),
+                    participant_id=participant_id,
+                    event_id=event_id,
+                    status=status,
+                    created_at=now - timedelta(seconds=rng.randrange(180 * 86400)),
+                )
+            )
+            if len(registrations) >= batch_size:
+                EventRegistration.objects.bulk_create(registrations)
+                created += len(registrations)
+                registrations = []
+    if registrations:
+        EventRegistration.objects.bulk_create(registrations)
+        created += len(registrations)
+    return created
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a production-sized dataset (participants, organizers, companies, events, registrations) "
+        "with batched bulk inserts, skewed topic and event popularity and reproducible output for a given seed"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--participants", type=int, default=100000, help="Number of participants to create")
+        parser.add_argument("--organizers", type=int, default=1000, help="Number of organizers to create")
+        parser.add_argument("--companies", type=int, default=500, help="Number of companies to create")
+        parser.add_argument("--events", type=int, default=20000, help="Number of events to create")
+        parser.add_argument(
+            "--registrations", type=int, default=1000000, help="Approximate number of registrations to create"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Number of rows per INSERT")
+        parser.add_argument("--seed", type=int, default=42, help="Seed of the generated data")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of processes inserting registrations, more than one requires PostgreSQL",
+        )
+        parser.add_argument(
+            "--skew", type=float, default=1.0, help="Zipf exponent of the event, topic and city popularity"
+        )
+        parser.add_argument("--password", default="StrongPassword123!", help="Password of every generated user")
+
+    def handle(self, *args, **options):
+        if options["participants"] < 1 or options["organizers"] < 1 or options["companies"] < 1:
+            raise CommandError("At least one participant, organizer and company is required.")
+        if options["workers"] > 1 and connection.vendor == "sqlite":
+            raise CommandError("SQLite doesn't support concurrent writes, use --workers 1.")
+        if User.objects.filter(email=self.get_email(options["seed"], 0)).exists():
+            raise CommandError(f"A dataset was already generated with seed {options['seed']}, use another seed.")
+
+        if not Topic.objects.exists():
+            call_command("create_topics")
+
+        self.seed = options["seed"]
+        self.batch_size = options["batch_size"]
+        self.skew = options["skew"]
+        self.rng = random.Random(self.seed)
+        self.fake = Faker()
+        self.fake.seed_instance(self.seed)
+        self.now = timezone.now()
+        # Hashing is deliberately slow, every user gets the same hash
+        self.password = make_password(options["password"])
+        self.topic_ids = list(Topic.objects.order_by("pk").values_list("pk", flat=True))
+        self.topic_cum_weights = list(accumulate(zipf_weights(len(self.topic_ids), self.skew, self.rng)))
+
+        participant_ids = self.timed("participants", self.create_participants, options["participants"])
+        organizer_ids = self.timed(
+            "organizers", self.create_organizers, options["organizers"], first_index=options["participants"]
+        )
+        company_ids = self.timed("companies", self.create_companies, options["companies"])
+        events = self.timed("events", self.create_events, options["events"], organizer_ids, company_ids)
+        self.timed(
+            "registrations",
+            self.create_registrations,
+            events,
+            participant_ids,
+            options["registrations"],
+            options["workers"],
+        )
+
+        call_command("reconcile_event_counters")
+        invalidate_event_responses()
+        invalidate_cache_namespace(EVENT_FACETS_CACHE_NAMESPACE)
+        self.stdout.write(self.style.SUCCESS("Dataset generated successfully!"))
+
+    def timed(self, name, create, *args, **kwargs):
+        """
+        Run a generation step and report its throughput.
+        """
+        started = time.perf_counter()
+        result = create(*args, **kwargs)
+        count = result if isinstance(result, int) else len(result)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"Created {count} {name} in {elapsed:.1f}s ({count / max(elapsed, 1e-6):.0f} rows/s).")
+        return result
+
+    @staticmethod
+    def get_email(seed, index) -> str:
+        return f"dataset-{seed}-{index}@example.com"
+
+    def build_users(self, first_index, count) -> list:
+        """
+        Return unsaved users with unique emails and phone numbers derived from the seed and their index.
+        """
+        return [
+            User(
+                id=random_uuid(self.rng),
+                email=self.get_email(self.seed, index),
+                phone=f"+{self.seed}-{index:09d}",
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=self.password,
+                date_joined=self.now,
+            )
+            for index in range(first_index, first_index + count)
+        ]
+
+    def pick_topic_ids(self, maximum) -> set:
+        """
+        Return between 1 and `maximum` distinct topic ids, popular topics being picked more often.
+        """
+        return set(self.rng.choices(self.topic_ids, cum_weights=self.topic_cum_weights, k=self.rng.randint(1, maximum)))
+
+    def create_participants(self, count) -> list:
+        """
+        Create the participants with 1 to 5 skewed interests and return their ids.
+        """
+        interests_model = Participant.interests.through
+        participant_ids = []
+        for start in range(0, count, self.batch_size):
+            users = User.objects.bulk_create(self.build_users(start, min(self.batch_size, count - start)))
+            participants = Participant.objects.bulk_create([Participant(user=user) for user in users])
+            interests_model.objects.bulk_create(
+                [
+                    interests_model(participant_id=participant.pk, topic_id=topic_id)
+                    for participant in participants
+                    for topic_id in self.pick_topic_ids(5)
+                ]
+            )
+            participant_ids.extend(participant.pk for participant in participants)
+        return participant_ids
+
+    def create_organizers(self, count, first_index) -> list:
+        """
+        Create the organizers and return their ids.
+        """
+        organizer_ids = []
+        for start in range(0, count, self.batch_size):
+            users = self.build_users(first_index + start, min(self.batch_size, count - start))
+            organizers = Organizer.objects.bulk_create(
+                [
+                    Organizer(
+                        user=user,
+                        bio=self.fake.text(max_nb_chars=200),
+                        city=self.fake.city()[:50],
+                        country=self.fake.country()[:50],
+                    )
+                    for user in User.objects.bulk_create(users)
+                ]
+            )
+            organizer_ids.extend(organizer.pk for organizer in organizers)
+        return organizer_ids
+
+    def create_companies(self, count) -> list:
+        """
+        Create the companies and return their ids.
+        """
+        company_ids = []
+        for start in range(0, count, self.batch_size):
+            companies = [
+                Company(
+                    id=random_uuid(self.rng),
+                    name=self.fake.company()[:50],
+                    description=self.fake.catch_phrase(),
+                    website_url=self.fake.url(),
+                    created_at=self.now,
+                )
+                for _ in range(min(self.batch_size, count - start))
+            ]
+            Company.objects.bulk_create(companies)
+            company_ids.extend(company.pk for company in companies)
+        return company_ids
+
+    def create_events(self, count, organizer_ids, company_ids) -> list:
+        """
+        Create events spread over the past and the next year and return their `(id, capacity)`.
+        Organizers, companies and cities follow a Zipf-like distribution, as do topics.
+        """
+        cities = [(self.fake.city()[:50], self.fake.country()[:50]) for _ in range(CITY_COUNT)]
+        city_cum_weights = list(accumulate(zipf_weights(len(cities), self.skew, self.rng)))
+        organizer_cum_weights = list(accumulate(zipf_weights(len(organizer_ids), self.skew, self.rng)))
+        company_cum_weights = list(accumulate(zipf_weights(len(company_ids), self.skew, self.rng)))
+        today = self.now.date()
+
+        events = []
+        for start in range(0, count, self.batch_size):
+            batch = []
+            event_topics = []
+            for _ in range(min(self.batch_size, count - start)):
+                start_date = today + timedelta(days=self.rng.randint(-365, 365))
+                end_date = start_date + timedelta(days=self.rng.randint(0, 3))
+                if self.rng.random() < 0.05:
+                    status = EventStatus.CANCELLED
+                elif end_date < today:
+                    status = EventStatus.COMPLETED
+                elif start_date <= today:
+                    status = EventStatus.ONGOING
+                else:
+                    status = EventStatus.UPCOMING
+                city, country = self.rng.choices(cities, cum_weights=city_cum_weights)[0]
+                event = Event(
+                    id=random_uuid(self.rng),
+                    title=self.fake.sentence(nb_words=5),
+                    description=self.fake.text(),
+                    event_start_date=start_date,
+                    event_end_date=end_date,
+                    event_start_time=datetime_time(self.rng.randint(8, 20), self.rng.choice((0, 15, 30, 45))),
+                    city=city,
+                    country=country,
+                    location=self.fake.street_address(),
+                    capacity=None if self.rng.random() < 0.1 else self.rng.randint(10, 1000),
+                    delivery_type=self.rng.choice(DeliveryType.values),
+                    status=status,
+                    event_type=self.rng.choice(EventType.values),
+                    company_id=self.rng.choices(company_ids, cum_weights=company_cum_weights)[0],
+                    organizer_id=self.rng.choices(organizer_ids, cum_weights=organizer_cum_weights)[0],
+                    created_at=self.now - timedelta(seconds=self.rng.randrange(365 * 86400)),
+                )
+                batch.append(event)
+                event_topics.extend(
+                    EventTopic(event_id=event.pk, topic_id=topic_id) for topic_id in self.pick_topic_ids(3)
+                )
+            Event.objects.bulk_create(batch)
+            EventTopic.objects.bulk_create(event_topics)
+            Event.objects.filter(pk__in=[event.pk for event in batch]).update_search_vector()
+            events.extend((event.pk, event.capacity) for event in batch)
+        return events
+
+    def create_registrations(self, events, participant_ids, total, workers) -> int:
+        """
+        Create about `total` registrations, spread over the events following a Zipf-like distribution
+        so that a few hot events get most of them, and return their number.
+        """
+        weights = zipf_weights(len(events), self.skew, self.rng)
+        total_weight = sum(weights)
+        counts = [min(len(participant_ids), round(total * weight / total_weight)) for weight in weights]
+
+        # Group the events into tasks of about `batch_size` registrations
+        tasks = []
+        group, group_count = [], 0
+        for (event_id, capacity), count in zip(events, counts):
+            if not count:
+                continue
+            group.append((event_id, count, capacity))
+            group_count += count
+            if group_count >= self.batch_size:
+                tasks.append((group, self.seed, self.batch_size, self.now))
+                group, group_count = [], 0
+        if group:
+            tasks.append((group, self.seed, self.batch_size, self.now))
+
+        if workers <= 1:
+            init_registration_worker(participant_ids)
+            return sum(create_registrations(task) for task in tasks)
+
+        # Forked workers must open their own database connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(workers, initializer=init_registration_worker, initargs=(participant_ids,)) as pool:
+            return sum(pool.imap_unordered(create_registrations, tasks))
@@ -0,0 +1,39 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from events.importers import ROW_READERS, EventImporter, get_import_format
+
+
+class Command(BaseCommand):
+    help = "Import events, with their topics and social media links, from a CSV or NDJSON file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument("--format", choices=sorted(ROW_READERS), help="File format, guessed from the extension")
+        parser.add_argument("--chunk-size", type=int, help="Number of rows inserted at a time")
+
+    def handle(self, *args, **options):
+        import_format = options["format"] or get_import_format(options["path"])
+        if import_format is None:
+            raise CommandError("Unknown file format, use --format.")
+
+        started = time.perf_counter()
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                report = EventImporter(chunk_size=options["chunk_size"]).run(stream, import_format)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['path']}: {exc}")
+        elapsed = time.perf_counter() - started
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        if report["failed"] > len(report["errors"]):
+            self.stderr.write(f"... and {report['failed'] - len(report['errors'])} more invalid rows.")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['imported']} events in {elapsed:.1f}s ({report['imported'] / elapsed:.0f} rows/s), "
+                f"{report['failed']} invalid rows skipped."
+            )
+        )
@@ -5,7 +5,19 @@ from django.core.management import call_command
 class Command(BaseCommand):
     help = "Run all data initialization commands in the correct order"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--large",
+            action="store_true",
+            help="Generate a production-sized dataset with `generate_dataset` instead of the sample data",
+        )
+
     def handle(self, *args, **options):
+        if options["large"]:
+            self.stdout.write("Running generate_dataset...")
+            call_command("generate_dataset")
+            return
+
         self.stdout.write("Starting data initialization...")
 
         try:
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from events.managers import REGISTRATION_COUNTER_FIELDS
+from events.models import Event, EventRegistration
+
+
+class Command(BaseCommand):
+    help = "Recalculate the denormalized registration counters of events and fix any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report events with drifted counters")
+
+    def handle(self, *args, **options):
+        actual_counts = {
+            field_name: Coalesce(
+                Subquery(
+                    EventRegistration.objects.filter(event=OuterRef("pk"), status=status)
+                    .order_by()
+                    .values("event")
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                Value(0),
+            )
+            for status, field_name in REGISTRATION_COUNTER_FIELDS.items()
+        }
+
+        drift = Q()
+        for status, field_name in REGISTRATION_COUNTER_FIELDS.items():
+            drift |= ~Q(**{field_name: F(f"{status.lower()}_registrations_count")})
+        drifted_ids = list(Event.objects.with_registration_counts().filter(drift).values_list("pk", flat=True))
+
+        self.stdout.write(f"Found {len(drifted_ids)} events with drifted registration counters.")
+        if options["dry_run"] or not drifted_ids:
+            return
+
+        updated = Event.objects.filter(pk__in=drifted_ids).update(**actual_counts, updated_at=timezone.now())
+        self.stdout.write(self.style.SUCCESS(f"Reconciled registration counters of {updated} events."))
@@ -0,0 +1,193 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection
+from django.utils import timezone
+
+from events.models import Company, Event, EventRegistration
+from users.models import Organizer, Participant, User
+from utils.choices import DeliveryType, EventRegistrationStatus, EventStatus, EventType
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent registrations at a single event and verify that it is never overbooked, then cancel "
+        "confirmed registrations concurrently and verify that the waitlist is promoted first come first served. "
+        "Run it against PostgreSQL, SQLite serializes all writers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--capacity", type=int, default=50, help="Capacity of the test event")
+        parser.add_argument("--registrations", type=int, default=300, help="Number of registrations to fire")
+        parser.add_argument("--workers", type=int, default=50, help="Number of parallel workers")
+        parser.add_argument(
+            "--cancellations", type=int, default=0, help="Number of confirmed registrations to cancel afterwards"
+        )
+        parser.add_argument("--keep", action="store_true", help="Keep the generated data after the run")
+
+    def handle(self, *args, **options):
+        capacity = options["capacity"]
+        count = options["registrations"]
+        workers = options["workers"]
+        tag = uuid.uuid4().hex[:8]
+
+        event, participant_ids, users = self.create_fixtures(tag, capacity, count)
+        self.stdout.write(f"Firing {count} registrations at a {capacity}-seat event with {workers} workers...")
+
+        chunks = [participant_ids[index::workers] for index in range(workers)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda chunk: self.register(event.id, chunk), chunks))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for chunk_latencies, _ in results for latency in chunk_latencies)
+        errors = sum(chunk_errors for _, chunk_errors in results)
+
+        event.refresh_from_db()
+        confirmed = event.registrations.filter(status=EventRegistrationStatus.CONFIRMED).count()
+        waitlisted = event.registrations.filter(status=EventRegistrationStatus.WAITLIST).count()
+
+        self.stdout.write(
+            f"Completed in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} registrations/s), {errors} errors"
+        )
+        self.stdout.write(f"Confirmed: {confirmed} (counter {event.confirmed_count}) / capacity {capacity}")
+        self.stdout.write(f"Waitlisted: {waitlisted} (counter {event.waitlist_count})")
+        if latencies:
+            self.stdout.write(
+                "Latency ms: p50={:.1f} p95={:.1f} p99={:.1f} max={:.1f}".format(
+                    *(1000 * value for value in self.percentiles(latencies, (50, 95, 99, 100)))
+                )
+            )
+
+        try:
+            if confirmed > capacity:
+                raise CommandError(f"Event overbooked: {confirmed} confirmed registrations for {capacity} seats.")
+            if (confirmed, waitlisted) != (event.confirmed_count, event.waitlist_count):
+                raise CommandError("Event registration counters drifted from the actual registrations.")
+            self.stdout.write(self.style.SUCCESS("No overbooking detected."))
+            if options["cancellations"]:
+                self.cancel_concurrently(event, options["cancellations"], workers)
+        finally:
+            if not options["keep"]:
+                event.company.delete()
+                event.organizer.user.delete()
+                User.objects.filter(pk__in=users).delete()
+
+    def cancel_concurrently(self, event, count, workers):
+        """
+        Cancel confirmed registrations from parallel workers and check that exactly the oldest
+        waitlisted registrations were promoted to the freed seats.
+        """
+        confirmed_ids = list(
+            event.registrations.filter(status=EventRegistrationStatus.CONFIRMED).values_list("pk", flat=True)[:count]
+        )
+        waitlist_ids = list(
+            event.registrations.filter(status=EventRegistrationStatus.WAITLIST)
+            .order_by("created_at", "id")
+            .values_list("pk", flat=True)
+        )
+        self.stdout.write(f"Cancelling {len(confirmed_ids)} confirmed registrations with {workers} workers...")
+
+        chunks = [confirmed_ids[index::workers] for index in range(workers)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self.cancel, chunks))
+        elapsed = time.perf_counter() - started
+
+        event.refresh_from_db()
+        confirmed = event.registrations.filter(status=EventRegistrationStatus.CONFIRMED).count()
+        waitlisted = event.registrations.filter(status=EventRegistrationStatus.WAITLIST).count()
+        promoted_ids = set(
+            event.registrations.filter(pk__in=waitlist_ids, status=EventRegistrationStatus.CONFIRMED).values_list(
+                "pk", flat=True
+            )
+        )
+        self.stdout.write(f"Completed in {elapsed:.2f}s, {len(promoted_ids)} waitlisted registrations promoted")
+        self.stdout.write(f"Confirmed: {confirmed} (counter {event.confirmed_count}) / capacity {event.capacity}")
+        self.stdout.write(f"Waitlisted: {waitlisted} (counter {event.waitlist_count})")
+
+        if confirmed > event.capacity:
+            raise CommandError(f"Event overbooked: {confirmed} confirmed registrations for {event.capacity} seats.")
+        if (confirmed, waitlisted) != (event.confirmed_count, event.waitlist_count):
+            raise CommandError("Event registration counters drifted from the actual registrations.")
+        if len(promoted_ids) != min(len(confirmed_ids), len(waitlist_ids)):
+            raise CommandError(f"{len(promoted_ids)} registrations promoted for {len(confirmed_ids)} freed seats.")
+        if promoted_ids != set(waitlist_ids[: len(promoted_ids)]):
+            raise CommandError("The waitlist was not promoted first come first served.")
+        self.stdout.write(self.style.SUCCESS("Waitlist promoted first come first served."))
+
+    @staticmethod
+    def cancel(registration_ids):
+        """
+        Cancel registrations one by one from a worker thread.
+        """
+        try:
+            for registration_id in registration_ids:
+                registration = EventRegistration.objects.get(pk=registration_id)
+                registration.status = EventRegistrationStatus.CANCELLED
+                registration.save()
+        finally:
+            connection.close()
+
+    def create_fixtures(self, tag, capacity, count):
+        """
+        Create a test event and `count` participants in bulk.
+        """
+        password = make_password(None)
+        organizer_user = User.objects.create(email=f"stress-{tag}-organizer@example.com", phone=f"stress-{tag}-o")
+        organizer = Organizer.objects.create(user=organizer_user)
+        company = Company.objects.create(name=f"Stress test {tag}", description="Stress test company")
+        event = Event.objects.create(
+            title=f"Stress test {tag}",
+            description="Stress test event",
+            event_start_time=timezone.now().time(),
+            event_start_date=timezone.now().date() + timedelta(days=30),
+            location="Stress test",
+            capacity=capacity,
+            delivery_type=DeliveryType.ONLINE,
+            status=EventStatus.UPCOMING,
+            event_type=EventType.OTHER,
+            company=company,
+            organizer=organizer,
+        )
+
+        users = User.objects.bulk_create(
+            User(email=f"stress-{tag}-{index}@example.com", phone=f"stress-{tag}-{index}", password=password)
+            for index in range(count)
+        )
+        participants = Participant.objects.bulk_create(Participant(user=user) for user in users)
+        return event, [participant.pk for participant in participants], [user.pk for user in users]
+
+    @staticmethod
+    def register(event_id, participant_ids):
+        """
+        Register participants one by one from a worker thread, returning the latencies and error count.
+        """
+        latencies = []
+        errors = 0
+        try:
+            for participant_id in participant_ids:
+                started = time.perf_counter()
+                try:
+                    EventRegistration.objects.create(
+                        participant_id=participant_id, event_id=event_id, status=EventRegistrationStatus.CONFIRMED
+                    )
+                except IntegrityError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+        return latencies, errors
+
+    @staticmethod
+    def percentiles(values, points):
+        """
+        Return the given percentiles of a sorted list of values.
+        """
+        quantiles = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+        return [values[-1] if point == 100 else quantiles[point - 1] for point in points]
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = "Compute the full-text search vector of the events missing one, e.g. right after it was added"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Recompute the search vector of every event")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Number of events per UPDATE")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write("Search vectors are only stored on PostgreSQL, nothing to update.")
+            return
+
+        queryset = Event.objects.order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        # Batches are walked by primary key, so that each UPDATE only locks `--batch-size` events
+        updated, last_pk = 0, None
+        while True:
+            batch = queryset.filter(pk__gt=last_pk) if last_pk else queryset
+            pks = list(batch.values_list("pk", flat=True)[: options["batch_size"]])
+            if not pks:
+                break
+            updated += Event.objects.filter(pk__in=pks).update_search_vector()
+            last_pk = pks[-1]
+        self.stdout.write(self.style.SUCCESS(f"Updated the search vector of {updated} events."))
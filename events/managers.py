@@ -0,0 +1,402 @@
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, models, transaction
+from django.db.models import Case, Count, Exists, F, FloatField, OuterRef, Q, Subquery, Value, When, Window
+from django.db.models.functions import Greatest, RowNumber
+from django.utils import timezone
+
+from utils.choices import EventRegistrationStatus
+from utils.utils import assign_unique_slugs
+
+# Text search configuration used for the event search vector and queries
+SEARCH_CONFIG = "english"
+
+# Event fields counted by `EventQuerySet.facet_counts`, in addition to topics
+FACET_FIELDS = ["status", "event_type", "delivery_type", "country"]
+
+# Fields matched by the case-insensitive search fallback on databases other than PostgreSQL
+SEARCH_FALLBACK_FIELDS = ["title", "description", "city", "country", "company__name"]
+
+# Statuses whose registrations give their seat up to the waitlist when leaving CONFIRMED
+SEAT_RELEASING_STATUSES = (EventRegistrationStatus.CANCELLED, EventRegistrationStatus.REJECTED)
+
+# Denormalized per-status registration counters stored on Event
+REGISTRATION_COUNTER_FIELDS = {
+    EventRegistrationStatus.CONFIRMED: "confirmed_count",
+    EventRegistrationStatus.WAITLIST: "waitlist_count",
+}
+
+
+class CompanyQuerySet(models.QuerySet):
+    """
+    Custom queryset for the Company model.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Insert the companies, generating their missing slugs with a single query.
+        """
+        objs = list(objs)
+        assign_unique_slugs([obj for obj in objs if not obj.slug], field_name="name")
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class EventQuerySet(models.QuerySet):
+    """
+    Custom queryset for the Event model.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """
+        Insert the events, generating their missing slugs with a single query.
+        Search vectors are not computed, see `update_search_vector`.
+        """
+        objs = list(objs)
+        assign_unique_slugs([obj for obj in objs if not obj.slug], field_name="title")
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def with_registration_counts(self):
+        """
+        Annotate each event with the number of its registrations per status in the same query,
+        e.g. `confirmed_registrations_count`, `waitlist_registrations_count`.
+        """
+        return self.annotate(
+            **{
+                f"{status.lower()}_registrations_count": Count("registrations", filter=Q(registrations__status=status))
+                for status in EventRegistrationStatus.values
+            }
+        )
+
+    def facet_counts(self):
+        """
+        Return the number of events per status, event type, delivery type, country and topic,
+        using one grouped query per facet.
+        """
+        from events.models import EventTopic
+
+        queryset = self.order_by().prefetch_related(None)
+        facets = {
+            field: [
+                {"value": row[field], "count": row["count"]}
+                for row in queryset.values(field).annotate(count=Count("pk")).order_by("-count", field)
+            ]
+            for field in FACET_FIELDS
+        }
+        topic_rows = (
+            EventTopic.objects.filter(event__in=queryset.values("pk"))
+            .values("topic_id", "topic__name")
+            .annotate(count=Count("pk"))
+            .order_by("-count", "topic_id")
+        )
+        facets["topics"] = [
+            {"value": row["topic_id"], "name": row["topic__name"], "count": row["count"]} for row in topic_rows
+        ]
+        return facets
+
+    def search(self, query):
+        """
+        Full-text search over title, description, location and company name, annotating `search_rank`.
+        On databases other than PostgreSQL every word of the query is matched case-insensitively instead,
+        and all results share the same rank.
+        """
+        if connections[self.db].vendor == "postgresql":
+            search_query = SearchQuery(query, search_type="websearch", config=SEARCH_CONFIG)
+            return self.filter(search_vector=search_query).annotate(
+                search_rank=SearchRank(F("search_vector"), search_query)
+            )
+
+        terms = query.split()
+        term_filters = [
+            reduce(or_, (Q(**{f"{field}__icontains": term}) for field in SEARCH_FALLBACK_FIELDS)) for term in terms
+        ]
+        queryset = self.filter(reduce(and_, term_filters)) if term_filters else self.none()
+        return queryset.annotate(search_rank=Value(1.0, output_field=FloatField()))
+
+    def update_search_vector(self):
+        """
+        Recompute the stored full-text search vector of the events in a single UPDATE.
+        Does nothing on databases other than PostgreSQL.
+        """
+        if connections[self.db].vendor != "postgresql":
+            return 0
+
+        from events.models import Company
+
+        company_name = Subquery(Company.objects.filter(pk=OuterRef("company_id")).values("name")[:1])
+        return self.update(
+            search_vector=(
+                SearchVector("title", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(company_name, "city", "country", weight="B", config=SEARCH_CONFIG)
+                + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+            )
+        )
+
+    def reserve_seat(self, event_id, count=1):
+        """
+        Atomically take `count` confirmed seats of an event in a single conditional UPDATE.
+        Returns False if the event doesn't have that many free seats.
+        """
+        has_free_seats = Q(capacity__isnull=True) | Q(capacity=0) | Q(confirmed_count__lte=F("capacity") - count)
+        return bool(
+            self.filter(has_free_seats, pk=event_id).update(
+                confirmed_count=F("confirmed_count") + count, updated_at=timezone.now()
+            )
+        )
+
+    def is_full(self, event_id):
+        """
+        Return True if all confirmed seats of an event are taken.
+        """
+        return self.filter(pk=event_id, capacity__gt=0, confirmed_count__gte=F("capacity")).exists()
+
+    def adjust_registration_counts(self, event_id, previous_status, status):
+        """
+        Atomically update the denormalized counters of an event for a registration
+        moving from `previous_status` (None for a new registration) to `status` (None for a deleted one).
+        """
+        self.update_registration_counts(event_id, [(previous_status, -1), (status, 1)])
+
+    def update_registration_counts(self, event_id, status_deltas):
+        """
+        Atomically add `(status, delta)` pairs to the denormalized counters of an event in one UPDATE.
+        """
+        self.bulk_update_registration_counts({event_id: status_deltas})
+
+    def bulk_update_registration_counts(self, status_deltas):
+        """
+        Atomically add `(status, delta)` pairs to the denormalized counters of many events in one UPDATE,
+        given as `{event_id: [(status, delta), ...]}`, with one `CASE` over the event ids per counter.
+        `updated_at` is bumped as well, since the available capacity of the events changes.
+        """
+        deltas = defaultdict(Counter)
+        for event_id, event_status_deltas in status_deltas.items():
+            for registration_status, delta in event_status_deltas:
+                field_name = REGISTRATION_COUNTER_FIELDS.get(registration_status)
+                if field_name:
+                    deltas[field_name][event_id] += delta
+
+        updates = {}
+        event_ids = set()
+        for field_name, event_deltas in deltas.items():
+            event_deltas = {event_id: delta for event_id, delta in event_deltas.items() if delta}
+            if event_deltas:
+                field_delta = Case(
+                    *(When(pk=event_id, then=Value(delta)) for event_id, delta in event_deltas.items()), default=0
+                )
+                updates[field_name] = Greatest(F(field_name) + field_delta, Value(0))
+                event_ids.update(event_deltas)
+        if updates:
+            self.filter(pk__in=event_ids).update(**updates, updated_at=timezone.now())
+
+
+class EventRegistrationQuerySet(models.QuerySet):
+    """
+    Custom queryset for the EventRegistration model.
+    """
+
+    def bulk_register(self, event_id, participant_ids, status=EventRegistrationStatus.CONFIRMED):
+        """
+        Register many participants for an event at once and return one result per participant.
+
+        Participants are validated with one query, seats are allocated in one pass against the capacity
+        of the locked event row and the registrations are inserted with a single `bulk_create`.
+        As with `EventRegistration.save`, confirmed registrations take the free seats in the given order
+        and the others are waitlisted, and pending registrations are waitlisted when the event is full.
+        """
+        from events.models import Event
+        from events.signals import invalidate_event_responses
+        from users.models import Participant
+
+        participant_ids = list(dict.fromkeys(participant_ids))
+        with transaction.atomic(using=self.db):
+            # Locking the event row serializes concurrent seat allocations, see `EventQuerySet.reserve_seat`
+            event = Event.objects.select_for_update().only("capacity", "confirmed_count").get(pk=event_id)
+            is_registered = dict(
+                Participant.objects.filter(pk__in=participant_ids)
+                .annotate(is_registered=Exists(self.filter(event_id=event_id, participant=OuterRef("pk"))))
+                .values_list("pk", "is_registered")
+            )
+
+            free_seats = max(event.capacity - event.confirmed_count, 0) if event.capacity else None
+            registrations = []
+            for participant_id in participant_ids:
+                if is_registered.get(participant_id, True):
+                    continue
+                registration_status = status
+                if free_seats == 0:
+                    registration_status = EventRegistrationStatus.WAITLIST
+                elif status == EventRegistrationStatus.CONFIRMED and free_seats is not None:
+                    free_seats -= 1
+                registrations.append(
+                    self.model(event_id=event_id, participant_id=participant_id, status=registration_status)
+                )
+
+            # Conflicts come from concurrent registrations of the same participants, which are skipped
+            self.bulk_create(registrations, ignore_conflicts=True)
+            inserted_ids = set(
+                self.filter(pk__in=[registration.pk for registration in registrations]).values_list("pk", flat=True)
+            )
+            registrations = {
+                registration.participant_id: registration
+                for registration in registrations
+                if registration.pk in inserted_ids
+            }
+            Event.objects.update_registration_counts(
+                event_id, Counter(registration.status for registration in registrations.values()).items()
+            )
+            if registrations:
+                invalidate_event_responses(event_id)
+
+        results = []
+        for participant_id in participant_ids:
+            registration = registrations.get(participant_id)
+            if registration is not None:
+                results.append(
+                    {"participant": participant_id, "registration": registration.pk, "status": registration.status}
+                )
+            elif participant_id not in is_registered:
+                results.append({"participant": participant_id, "detail": "Participant does not exist."})
+            else:
+                results.append({"participant": participant_id, "detail": "Participant is already registered."})
+        return results
+
+    def bulk_update_status(self, status):
+        """
+        Move every registration of the queryset to `status` and return a summary with the number of matched and
+        updated registrations, and the number of registrations per new status.
+
+        The registrations are locked and read once, then changed with a single UPDATE, the counters of all the
+        affected events are adjusted with a single UPDATE, and the released seats are given to the waitlists of
+        all their events in one pass, see `promote_waitlists`. As with `EventRegistration.save`, registrations
+        only get the free seats of their event when confirmed, oldest first, and the others are waitlisted.
+        """
+        from events.models import Event
+        from events.signals import invalidate_event_responses
+
+        with transaction.atomic(using=self.db):
+            rows = list(
+                self.select_for_update(of=("self",))
+                .order_by("created_at", "id")
+                .values_list("pk", "event_id", "status")
+            )
+            event_ids = {event_id for _, event_id, _ in rows}
+            free_seats = {}
+            if status == EventRegistrationStatus.CONFIRMED:
+                events = Event.objects.select_for_update().filter(pk__in=event_ids)
+                free_seats = {
+                    event_id: max(capacity - confirmed_count, 0) if capacity else None
+                    for event_id, capacity, confirmed_count in events.values_list("pk", "capacity", "confirmed_count")
+                }
+
+            new_statuses = defaultdict(list)
+            status_deltas = defaultdict(list)
+            released_event_ids = set()
+            for pk, event_id, current_status in rows:
+                if current_status == status:
+                    continue
+                new_status = status
+                if status == EventRegistrationStatus.CONFIRMED and free_seats[event_id] is not None:
+                    if free_seats[event_id]:
+                        free_seats[event_id] -= 1
+                    else:
+                        new_status = EventRegistrationStatus.WAITLIST
+                if new_status == current_status:
+                    continue
+                new_statuses[new_status].append(pk)
+                status_deltas[event_id] += [(current_status, -1), (new_status, 1)]
+                if current_status == EventRegistrationStatus.CONFIRMED and new_status in SEAT_RELEASING_STATUSES:
+                    released_event_ids.add(event_id)
+
+            if new_statuses:
+                self.model.objects.filter(pk__in=[pk for pks in new_statuses.values() for pk in pks]).update(
+                    status=Case(
+                        *(When(pk__in=pks, then=Value(new_status)) for new_status, pks in new_statuses.items())
+                    ),
+                    updated_at=timezone.now(),
+                )
+                Event.objects.bulk_update_registration_counts(status_deltas)
+                invalidate_event_responses(*status_deltas)
+                self.promote_waitlists(released_event_ids)
+
+        return {
+            "matched": len(rows),
+            "updated": sum(len(pks) for pks in new_statuses.values()),
+            "statuses": {new_status: len(pks) for new_status, pks in new_statuses.items()},
+        }
+
+    def promote_waitlist(self, event_id):
+        """
+        Confirm the oldest waitlisted registrations of an event for its free seats, see `promote_waitlists`.
+        """
+        return self.promote_waitlists([event_id])
+
+    def promote_waitlists(self, event_ids):
+        """
+        Confirm the oldest waitlisted registrations of the events for their free seats, first come first served,
+        and return the ids of the promoted registrations.
+
+        The events are locked and read with one query, so concurrent promotions for the same event are serialized
+        and never overbook it. The waitlisted registrations are ranked per event and the ones within the free seats
+        are picked with one `SKIP LOCKED` query, then confirmed and counted with one UPDATE each, whatever the number
+        of events. Promoted participants are notified by one batched email job once the transaction commits.
+        """
+        from events.models import Event
+        from events.signals import invalidate_event_responses
+        from utils.tasks import send_bulk_registration_emails
+
+        if not event_ids:
+            return []
+
+        with transaction.atomic(using=self.db):
+            events = Event.objects.select_for_update().filter(pk__in=event_ids).order_by("pk")
+            # Events without a capacity take their whole waitlist
+            seat_filters = [
+                (
+                    Q(event_id=event_id, waitlist_position__lte=capacity - confirmed_count)
+                    if capacity
+                    else Q(event_id=event_id)
+                )
+                for event_id, capacity, confirmed_count in events.values_list("pk", "capacity", "confirmed_count")
+                if not capacity or capacity > confirmed_count
+            ]
+            if not seat_filters:
+                return []
+
+            waitlist = (
+                self.model.objects.filter(event_id__in=event_ids, status=EventRegistrationStatus.WAITLIST)
+                .annotate(
+                    waitlist_position=Window(
+                        RowNumber(), partition_by=F("event_id"), order_by=(F("created_at").asc(), F("id").asc())
+                    )
+                )
+                .filter(reduce(or_, seat_filters))
+            )
+            # Registrations locked by another transaction are left waitlisted, their status is about to change
+            promoted = list(
+                self.model.objects.filter(pk__in=waitlist.values("pk"))
+                .select_for_update(skip_locked=True)
+                .order_by("created_at", "id")
+                .values_list("pk", "event_id")
+            )
+            if not promoted:
+                return []
+
+            promoted_ids = [pk for pk, _ in promoted]
+            self.model.objects.filter(pk__in=promoted_ids).update(
+                status=EventRegistrationStatus.CONFIRMED, updated_at=timezone.now()
+            )
+            promoted_counts = Counter(event_id for _, event_id in promoted)
+            Event.objects.bulk_update_registration_counts(
+                {
+                    event_id: [(EventRegistrationStatus.WAITLIST, -count), (EventRegistrationStatus.CONFIRMED, count)]
+                    for event_id, count in promoted_counts.items()
+                }
+            )
+            invalidate_event_responses(*promoted_counts)
+            transaction.on_commit(
+                lambda: send_bulk_registration_emails.delay([str(pk) for pk in promoted_ids]), using=self.db
+            )
+        return promoted_ids
@@ -1,10 +1,19 @@
 import uuid
+from functools import partial
 
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 from django.db.models import F, Q
 from django.utils import timezone
 
+from events.managers import (
+    CompanyQuerySet,
+    EventQuerySet,
+    EventRegistrationQuerySet,
+    REGISTRATION_COUNTER_FIELDS,
+    SEAT_RELEASING_STATUSES,
+)
 from users.models import Organizer, Participant
 from utils.choices import (
     EventType,
@@ -14,7 +23,8 @@ from utils.choices import (
     TopicCategory,
     EventRegistrationStatus,
 )
-from utils.utils import create_custom_image_file_path, generate_unique_slug
+from utils.indexes import SearchVectorIndex
+from utils.utils import create_custom_image_file_path, save_with_unique_slug
 
 
 def get_event_image_path(instance, filename: str) -> str:
@@ -53,17 +63,30 @@ class Company(BaseModel):
     website_url = models.URLField(max_length=200, blank=True, verbose_name="Company Website URL")
     slug = models.SlugField(db_index=True, editable=False, unique=True, verbose_name="Slug")
 
+    objects = CompanyQuerySet.as_manager()
+
     class Meta(BaseModel.Meta):
         verbose_name = "Company"
         verbose_name_plural = "Companies"
 
+    _loaded_name = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_name = instance.__dict__.get("name")
+        return instance
+
     def save(self, *args, **kwargs):
         """
         Save method with slug generation.
+        Refreshes the search vectors of the company's events when its name changes.
         """
-        if not self.slug:
-            self.slug = generate_unique_slug(self, field_name="name")
-        super().save(*args, **kwargs)
+        is_renamed = not self._state.adding and self._loaded_name != self.name
+        save_with_unique_slug(self, partial(super().save, *args, **kwargs), field_name="name")
+        if is_renamed:
+            self.events.all().update_search_vector()
+        self._loaded_name = self.name
 
     def __str__(self) -> str:
         return self.name
@@ -116,16 +139,43 @@ class Event(BaseModel):
     status = models.CharField(max_length=50, choices=EventStatus.choices, verbose_name="Event Status")
     event_type = models.CharField(max_length=50, choices=EventType.choices, verbose_name="Event Type")
     topics = models.ManyToManyField(Topic, related_name="events", verbose_name="Event Topics", blank=True)
-    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name="events", verbose_name="Company")
-    organizer = models.ForeignKey(Organizer, on_delete=models.CASCADE, related_name="events", verbose_name="Organizer")
+    # Indexed by the composite `event_company_idx` and `event_organizer_idx` indexes
+    company = models.ForeignKey(
+        Company, on_delete=models.CASCADE, db_index=False, related_name="events", verbose_name="Company"
+    )
+    organizer = models.ForeignKey(
+        Organizer, on_delete=models.CASCADE, db_index=False, related_name="events", verbose_name="Organizer"
+    )
 
     image = models.ImageField(blank=True, null=True, upload_to=get_event_image_path, verbose_name="Event Image")
     slug = models.SlugField(db_index=True, editable=False, unique=True, verbose_name="Slug")
 
+    confirmed_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Confirmed Registrations")
+    waitlist_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Waitlisted Registrations")
+    search_vector = SearchVectorField(null=True, editable=False, verbose_name="Search Vector")
+
+    objects = EventQuerySet.as_manager()
+
     class Meta(BaseModel.Meta):
         verbose_name = "Event"
         verbose_name_plural = "Events"
-        ordering = ["-event_start_date", "event_start_time"]
+        ordering = ["-event_start_date", "event_start_time", "id"]
+        indexes = [
+            models.Index(fields=["-event_start_date", "event_start_time", "id"], name="event_keyset_idx"),
+            SearchVectorIndex(fields=["search_vector"], name="event_search_vector_idx"),
+            # Filters of the event list, followed by the keyset ordering
+            models.Index(fields=["status", "-event_start_date", "event_start_time", "id"], name="event_status_idx"),
+            models.Index(fields=["event_type", "-event_start_date", "event_start_time", "id"], name="event_type_idx"),
+            models.Index(
+                fields=["delivery_type", "-event_start_date", "event_start_time", "id"], name="event_delivery_type_idx"
+            ),
+            models.Index(fields=["country", "-event_start_date", "event_start_time", "id"], name="event_country_idx"),
+            models.Index(fields=["city", "-event_start_date", "event_start_time", "id"], name="event_city_idx"),
+            models.Index(fields=["company", "-event_start_date", "event_start_time", "id"], name="event_company_idx"),
+            models.Index(
+                fields=["organizer", "-event_start_date", "event_start_time", "id"], name="event_organizer_idx"
+            ),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=Q(event_end_date__gte=F("event_start_date")) | Q(event_end_date__isnull=True),
@@ -145,21 +195,47 @@ class Event(BaseModel):
                 raise ValidationError("The event cannot start in the past.")
         super().clean()
 
+    # Fields maintained with dedicated UPDATE statements, never written back from an instance
+    DENORMALIZED_FIELDS = (*REGISTRATION_COUNTER_FIELDS.values(), "search_vector")
+
+    _loaded_capacity = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_capacity = instance.__dict__.get("capacity")
+        return instance
+
     def save(self, *args, **kwargs):
         """
-        Save method with slug generation.
+        Save method with slug generation and search vector refresh.
+        Registration counters are maintained with atomic updates, so they are never written
+        back from a (possibly stale) instance when an existing event is saved.
+        Waitlisted registrations are promoted when the capacity grows.
         """
-        if not self.slug:
-            self.slug = generate_unique_slug(self, field_name="title")
-        super().save(*args, **kwargs)
+        has_more_seats = (
+            not self._state.adding
+            and self._loaded_capacity
+            and (not self.capacity or self.capacity > self._loaded_capacity)
+        )
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.DENORMALIZED_FIELDS
+            ]
+        save_with_unique_slug(self, partial(super().save, *args, **kwargs), field_name="title")
+        Event.objects.filter(pk=self.pk).update_search_vector()
+        if has_more_seats:
+            EventRegistration.objects.promote_waitlist(self.pk)
+        self._loaded_capacity = self.capacity
 
     @property
     def participants_count(self):
         """
         Returns the number of participants in the event.
         """
-        return self.registrations.filter(status=EventRegistrationStatus.CONFIRMED).count()
-
+        return self.confirmed_count
 
     @property
     def available_capacity(self):
@@ -175,6 +251,14 @@ class Event(BaseModel):
         return f"{self.title} ({self.event_start_date} - {self.event_end_date})"
 
 
+# Auto-created through model of `Event.topics`, on the `events_event_topics` table. Its (topic, event)
+# index is added after the migrations, see `events.signals.create_event_topic_index`
+EventTopic = Event.topics.through
+
+# Index of `Event.topics` for the topic filters and facets, in addition to the unique (event, topic) one
+EVENT_TOPIC_INDEX = models.Index(fields=["topic", "event"], name="event_topic_topic_event_idx")
+
+
 class EventSocialMedia(BaseSocialMedia):
     """
     Social media links associated with an event.
@@ -194,7 +278,10 @@ class EventRegistration(BaseModel):
     participant = models.ForeignKey(
         Participant, on_delete=models.CASCADE, verbose_name="Participant", related_name="registrations"
     )
-    event = models.ForeignKey(Event, on_delete=models.CASCADE, verbose_name="Event", related_name="registrations")
+    # Indexed by the composite `registration_event_idx` and `registration_event_status_idx` indexes
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, db_index=False, verbose_name="Event", related_name="registrations"
+    )
     status = models.CharField(
         max_length=50,
         choices=EventRegistrationStatus.choices,
@@ -202,16 +289,67 @@ class EventRegistration(BaseModel):
         verbose_name="Event Registration Status",
     )
 
+    objects = EventRegistrationQuerySet.as_manager()
+
     class Meta:
         unique_together = ("participant", "event")
+        indexes = [
+            # Keyset pagination of the registration list, newest first, overall and per event
+            models.Index(fields=["-created_at", "id"], name="registration_keyset_idx"),
+            models.Index(fields=["event", "-created_at", "id"], name="registration_event_idx"),
+            # Waitlist promotion picks the oldest registrations of an event in a given status
+            models.Index(fields=["event", "status", "created_at"], name="registration_event_status_idx"),
+        ]
+
+    _loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
 
     def save(self, *args, **kwargs):
         """
-        Override save to handle the logic for available capacity.
+        Override save to handle the logic for available capacity
+        and to keep the registration counters of the event in sync.
+
+        A confirmed seat is taken with a single conditional UPDATE of the event row, so concurrent
+        registrations can never push `confirmed_count` above `capacity`; registrations that don't
+        get a seat are put on the waitlist. The seat of a cancelled or rejected confirmed registration
+        goes to the oldest waitlisted registration.
+        """
+        previous_status = None if self._state.adding else self._loaded_status
+        counted_status = self.status
+
+        with transaction.atomic():
+            if self.status == EventRegistrationStatus.CONFIRMED and previous_status != self.status:
+                if Event.objects.reserve_seat(self.event_id):
+                    # The seat is already counted by the reservation
+                    counted_status = None
+                else:
+                    self.status = counted_status = EventRegistrationStatus.WAITLIST
+            elif self._state.adding and Event.objects.is_full(self.event_id):
+                self.status = counted_status = EventRegistrationStatus.WAITLIST
+
+            super().save(*args, **kwargs)
+            if previous_status != self.status:
+                Event.objects.adjust_registration_counts(self.event_id, previous_status, counted_status)
+            if previous_status == EventRegistrationStatus.CONFIRMED and self.status in SEAT_RELEASING_STATUSES:
+                EventRegistration.objects.promote_waitlist(self.event_id)
+        self._loaded_status = self.status
+
+    def delete(self, *args, **kwargs):
+        """
+        Override delete to release the registration from the event counters, and its seat to the waitlist.
         """
-        if self.event.available_capacity is not None and self.event.available_capacity == 0:
-            self.status = EventRegistrationStatus.WAITLIST
-        super().save(*args, **kwargs)
+        status = self._loaded_status or self.status
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Event.objects.adjust_registration_counts(self.event_id, status, None)
+            if status == EventRegistrationStatus.CONFIRMED:
+                EventRegistration.objects.promote_waitlist(self.event_id)
+        return result
 
     def __str__(self):
         return f"{self.participant.user.email} registered for {self.event.title} - {self.status}"
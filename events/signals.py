@@ -0,0 +1,126 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from events.models import (
+    EVENT_TOPIC_INDEX,
+    Company,
+    CompanySocialMedia,
+    Event,
+    EventRegistration,
+    EventSocialMedia,
+    EventTopic,
+)
+from utils.cache import invalidate_cache_namespace
+
+# Cache namespace of the event facet counts
+EVENT_FACETS_CACHE_NAMESPACE = "event_facets"
+
+# Response cache namespaces of the event and company endpoints, see `utils.cache.CachedResponseMixin`
+EVENTS_CACHE_NAMESPACE = "events"
+COMPANIES_CACHE_NAMESPACE = "companies"
+
+
+def invalidate_event_responses(*event_ids):
+    """
+    Drop the cached detail payloads of the given events and all cached event lists.
+    """
+    for event_id in event_ids:
+        invalidate_cache_namespace(f"{EVENTS_CACHE_NAMESPACE}:{event_id}")
+    invalidate_cache_namespace(f"{EVENTS_CACHE_NAMESPACE}:list")
+
+
+def invalidate_company_responses(*slugs):
+    """
+    Drop the cached detail payloads of the given companies and all cached company lists.
+    """
+    for slug in slugs:
+        invalidate_cache_namespace(f"{COMPANIES_CACHE_NAMESPACE}:{slug}")
+    invalidate_cache_namespace(f"{COMPANIES_CACHE_NAMESPACE}:list")
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def invalidate_event_caches(sender, instance, **kwargs):
+    """
+    Drop cached payloads and facet counts whenever an event changes.
+    """
+    invalidate_event_responses(instance.pk)
+    invalidate_cache_namespace(EVENT_FACETS_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=EventTopic)
+@receiver(post_delete, sender=EventTopic)
+def invalidate_event_topic_caches(sender, instance, **kwargs):
+    """
+    Drop cached payloads and facet counts whenever a topic assignment changes.
+    """
+    invalidate_event_responses(instance.event_id)
+    invalidate_cache_namespace(EVENT_FACETS_CACHE_NAMESPACE)
+
+
+@receiver(m2m_changed, sender=EventTopic)
+def invalidate_event_caches_on_topics_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Drop cached payloads and facet counts when topics are added to or removed from events.
+    """
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # Topic.events was changed, `pk_set` holds event ids (None on clear)
+        invalidate_event_responses(*(pk_set or ()))
+    else:
+        invalidate_event_responses(instance.pk)
+    invalidate_cache_namespace(EVENT_FACETS_CACHE_NAMESPACE)
+
+
+@receiver(post_save, sender=EventSocialMedia)
+@receiver(post_delete, sender=EventSocialMedia)
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def invalidate_event_related_caches(sender, instance, **kwargs):
+    """
+    Drop cached payloads of the event whose social media or registrations (capacity) changed.
+    """
+    invalidate_event_responses(instance.event_id)
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_caches(sender, instance, **kwargs):
+    """
+    Drop cached payloads whenever a company changes.
+    """
+    invalidate_company_responses(instance.slug)
+
+
+@receiver(post_save, sender=CompanySocialMedia)
+@receiver(post_delete, sender=CompanySocialMedia)
+def invalidate_company_related_caches(sender, instance, **kwargs):
+    """
+    Drop cached payloads of the company whose social media changed.
+    """
+    slug = Company.objects.filter(pk=instance.company_id).values_list("slug", flat=True).first()
+    if slug:
+        # The company may already be gone when its social media is deleted in cascade
+        invalidate_company_responses(slug)
+
+
+@receiver(post_migrate)
+def create_event_topic_index(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    Add `EVENT_TOPIC_INDEX` to the through table of `Event.topics` once it exists.
+    Auto-created through models have no model options to declare the index in, and keeping the auto-created
+    table lets existing databases upgrade with a plain `migrate`.
+    """
+    if sender.name != "events":
+        return
+    connection = connections[using]
+    table = EventTopic._meta.db_table
+    with connection.cursor() as cursor:
+        if table not in connection.introspection.table_names(cursor):
+            return
+        if EVENT_TOPIC_INDEX.name in connection.introspection.get_constraints(cursor, table):
+            return
+    with connection.schema_editor() as schema_editor:
+        schema_editor.add_index(EventTopic, EVENT_TOPIC_INDEX)
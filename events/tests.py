@@ -0,0 +1,438 @@
+import datetime
+import io
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, OperationalError, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+
+from events.api.views import EventViewSet
+from events.importers import EventImporter
+from events.models import Company, Event, EventRegistration, EventSocialMedia, Topic
+from users.api.serializers import TokenObtainPairSerializer
+from users.authentication import CachedJWTAuthentication
+from users.models import Organizer, Participant, User
+from utils.choices import EventRegistrationStatus, TopicCategory
+from utils.utils import get_unique_slugs
+
+
+def create_user(email, **kwargs):
+    """
+    Create a user with a unique phone number.
+    """
+    return User.objects.create_user(email=email, password="password", phone=email, **kwargs)
+
+
+def create_organizer(email="organizer@example.com"):
+    return Organizer.objects.create(user=create_user(email))
+
+
+def create_participant(email="participant@example.com"):
+    return Participant.objects.create(user=create_user(email))
+
+
+def get_api_client(user):
+    """
+    Return an API client authenticated with an access token of the user, as issued by the login endpoint.
+    """
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {TokenObtainPairSerializer.get_token(user).access_token}")
+    return client
+
+
+def create_event(organizer, company, **kwargs):
+    """
+    Create an upcoming event, the fields can be overridden with keyword arguments.
+    """
+    fields = {
+        "title": "Annual Tech Conference",
+        "description": "Talks about Python and Django.",
+        "event_start_time": datetime.time(10, 0),
+        "event_start_date": datetime.date.today() + datetime.timedelta(days=30),
+        "location": "Main Hall",
+        "city": "Kyiv",
+        "country": "Ukraine",
+        "delivery_type": "OFFLINE",
+        "status": "UPCOMING",
+        "event_type": "CONFERENCE",
+        **kwargs,
+    }
+    return Event.objects.create(organizer=organizer, company=company, **fields)
+
+
+class EventListQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = create_organizer()
+        company = Company.objects.create(name="Acme", description="Events company")
+        topics = [Topic.objects.create(name=name) for name in TopicCategory.values[:2]]
+        for number in range(50):
+            event = create_event(organizer, company, title=f"Conference {number}")
+            event.topics.set(topics)
+            EventSocialMedia.objects.create(event=event, platform="telegram", url=f"https://t.me/event{number}")
+        cls.user = create_participant().user
+
+    def setUp(self):
+        cache.clear()
+        self.client = get_api_client(self.user)
+
+    def assert_page_queries_are_constant(self, query_string=""):
+        """
+        Assert that a page of 50 events takes as many queries as a page of 5 events.
+        """
+        with CaptureQueriesContext(connection) as small_page:
+            response = self.client.get(f"/api/events/?page_size=5{query_string}")
+        self.assertEqual(len(response.data["results"]), 5)
+
+        with self.assertNumQueries(len(small_page)):
+            response = self.client.get(f"/api/events/?page_size=50{query_string}")
+        self.assertEqual(len(response.data["results"]), 50)
+
+    def test_list_queries_do_not_depend_on_the_page_size(self):
+        self.assert_page_queries_are_constant()
+
+    def test_list_queries_with_relations_do_not_depend_on_the_page_size(self):
+        self.assert_page_queries_are_constant("&fields=id,title,topics,social_media")
+
+
+class EventConditionalGetTests(TestCase):
+    # Transaction statements of `ATOMIC_REQUESTS` (savepoints inside a test case), which read no data
+    TRANSACTION_STATEMENT = re.compile(r"^(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b")
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = create_organizer()
+        company = Company.objects.create(name="Acme", description="Events company")
+        cls.event = create_event(organizer, company)
+        for number in range(4):
+            create_event(organizer, company, title=f"Conference {number}")
+        cls.user = create_participant().user
+
+    def setUp(self):
+        cache.clear()
+        self.client = get_api_client(self.user)
+
+    def get_not_modified_queries(self, url):
+        """
+        Request the url, then again with the returned ETag, and return the queries of the 304 response.
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        return [query["sql"] for query in queries if not self.TRANSACTION_STATEMENT.match(query["sql"])]
+
+    def test_not_modified_responses_run_one_query(self):
+        # With cached user snapshots, the authentication takes no query and only the `updated_at` lookup is left
+        with mock.patch.object(EventViewSet, "authentication_classes", [CachedJWTAuthentication]):
+            for url in ("/api/events/", f"/api/events/{self.event.pk}/"):
+                with self.subTest(url=url):
+                    queries = self.get_not_modified_queries(url)
+                    self.assertEqual(len(queries), 1, queries)
+                    self.assertIn('"updated_at"', queries[0])
+
+    def test_not_modified_responses_with_database_authentication(self):
+        # `JWTAuthentication` loads the user and their profiles with one query, on top of the `updated_at` lookup
+        for url in ("/api/events/", f"/api/events/{self.event.pk}/"):
+            with self.subTest(url=url):
+                queries = self.get_not_modified_queries(url)
+                self.assertEqual(len(queries), 2, queries)
+                self.assertIn('"users_user"', queries[0])
+
+    def test_list_is_not_stale_after_a_row_leaves_the_page(self):
+        url = "/api/events/?page_size=2"
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+        page = [event["id"] for event in response.json()["results"]]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.filter(pk=page[-1]).delete()
+
+        # The rows left on the page are no newer, which a Last-Modified validator would have answered with a 304
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time()))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual([event["id"] for event in response.json()["results"]], page)
+
+    def test_retrieve_is_not_modified_since_its_last_modified(self):
+        url = f"/api/events/{self.event.pk}/"
+        response = self.client.get(url)
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+
+class EventRegistrationStreamTests(TestCase):
+    url = "/api/events/registrations/list/"
+
+    @classmethod
+    def setUpTestData(cls):
+        organizer = create_organizer()
+        company = Company.objects.create(name="Acme", description="Events company")
+        event = create_event(organizer, company)
+        for number in range(5):
+            EventRegistration.objects.create(
+                event=event, participant=create_participant(f"participant{number}@example.com")
+            )
+        cls.admin = create_user("admin@example.com", is_staff=True, is_superuser=True)
+
+    def setUp(self):
+        self.client = get_api_client(self.admin)
+
+    @override_settings(API_STREAMING_CHUNK_SIZE=2)
+    def test_registrations_are_streamed_in_chunks(self):
+        response = self.client.get(self.url, {"stream": "1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        # One chunk per 2 registrations, then the closing bracket
+        self.assertEqual(len(chunks), 4)
+        expected = EventRegistration.objects.order_by("-created_at", "id").values_list("id", flat=True)
+        self.assertEqual([row["id"] for row in json.loads(b"".join(chunks))], [str(pk) for pk in expected])
+
+    def test_registrations_are_paginated_without_stream(self):
+        response = self.client.get(self.url, {"page_size": 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.json()["results"]), 2)
+
+
+class BulkStatusUpdateTests(TestCase):
+    capacity = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = create_organizer()
+        cls.company = Company.objects.create(name="Acme", description="Events company")
+        cls.participants = [create_participant(f"participant{number}@example.com") for number in range(4)]
+
+    def create_events(self, count):
+        events = [create_event(self.organizer, self.company, capacity=self.capacity) for _ in range(count)]
+        # The first registrations of each event take its seats, the others are waitlisted
+        for event in events:
+            for participant in self.participants:
+                EventRegistration.objects.create(
+                    event=event, participant=participant, status=EventRegistrationStatus.CONFIRMED
+                )
+        return events
+
+    def cancel_confirmed(self, events):
+        """
+        Cancel the confirmed registrations of the events in bulk and return the queries it took.
+        """
+        registrations = EventRegistration.objects.filter(event__in=events, status=EventRegistrationStatus.CONFIRMED)
+        with CaptureQueriesContext(connection) as queries:
+            summary = registrations.bulk_update_status(EventRegistrationStatus.CANCELLED)
+        self.assertEqual(summary["updated"], self.capacity * len(events))
+        return len(queries)
+
+    def test_cancellations_promote_the_waitlists_of_all_events(self):
+        events = self.create_events(3)
+        self.cancel_confirmed(events)
+
+        for event in Event.objects.filter(pk__in=[event.pk for event in events]):
+            self.assertEqual((event.confirmed_count, event.waitlist_count), (self.capacity, 0))
+            self.assertEqual(
+                list(event.registrations.order_by("created_at", "id").values_list("status", flat=True)),
+                [EventRegistrationStatus.CANCELLED] * 2 + [EventRegistrationStatus.CONFIRMED] * 2,
+            )
+
+    def test_queries_do_not_depend_on_the_number_of_events(self):
+        self.assertEqual(self.cancel_confirmed(self.create_events(2)), self.cancel_confirmed(self.create_events(5)))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class ConcurrentRegistrationTests(TransactionTestCase):
+    """
+    Registrations and cancellations are fired from parallel threads, each with its own database connection.
+    SQLite serializes the writers, PostgreSQL runs them concurrently (see also `stress_registrations`).
+    """
+
+    capacity = 5
+    registrations = 20
+
+    def setUp(self):
+        organizer = create_organizer()
+        company = Company.objects.create(name="Acme", description="Events company")
+        self.event = create_event(organizer, company, capacity=self.capacity)
+        self.participant_ids = [
+            create_participant(f"participant{number}@example.com").pk for number in range(self.registrations)
+        ]
+        # Promoted participants are notified by a Celery task
+        patcher = mock.patch("utils.tasks.send_bulk_registration_emails.delay")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_concurrently(self, function, arguments):
+        """
+        Call the function with each argument from its own thread, all starting at once, and return the results.
+        """
+        barrier = threading.Barrier(len(arguments))
+
+        def run(argument):
+            try:
+                barrier.wait()
+                return function(argument)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(arguments)) as executor:
+            return list(executor.map(run, arguments))
+
+    @staticmethod
+    def retry_when_locked(function, *args, **kwargs):
+        """
+        Call the function until SQLite lets it through. The shared in-memory test database of SQLite fails
+        concurrent writers with "database table is locked" instead of waiting; their transaction is rolled
+        back, so the call can be repeated. Other databases run the call once.
+        """
+        while True:
+            try:
+                return function(*args, **kwargs)
+            except OperationalError as exc:
+                if connection.vendor != "sqlite" or "locked" not in str(exc):
+                    raise
+            time.sleep(0.001)
+
+    def get_statuses(self):
+        return dict(EventRegistration.objects.filter(event=self.event).values_list("pk", "status"))
+
+    def register(self, participant_id):
+        """
+        Register a participant and return the confirmed count of the event right after.
+        """
+        self.retry_when_locked(
+            EventRegistration.objects.create,
+            participant_id=participant_id,
+            event_id=self.event.pk,
+            status=EventRegistrationStatus.CONFIRMED,
+        )
+        confirmed_count = Event.objects.values_list("confirmed_count", flat=True).filter(pk=self.event.pk)
+        return self.retry_when_locked(confirmed_count.get)
+
+    def cancel(self, registration_id):
+        registration = self.retry_when_locked(EventRegistration.objects.get, pk=registration_id)
+        registration.status = EventRegistrationStatus.CANCELLED
+        self.retry_when_locked(registration.save)
+
+    def test_concurrent_registrations_never_overbook(self):
+        confirmed_counts = self.run_concurrently(self.register, self.participant_ids)
+
+        self.assertLessEqual(max(confirmed_counts), self.capacity)
+        statuses = list(self.get_statuses().values())
+        self.assertEqual(statuses.count(EventRegistrationStatus.CONFIRMED), self.capacity)
+        self.assertEqual(statuses.count(EventRegistrationStatus.WAITLIST), self.registrations - self.capacity)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.confirmed_count, self.event.waitlist_count), (5, 15))
+
+    def test_concurrent_cancellations_promote_the_waitlist_first_come_first_served(self):
+        self.run_concurrently(self.register, self.participant_ids)
+        registrations = EventRegistration.objects.filter(event=self.event).order_by("created_at", "id")
+        confirmed_ids = list(
+            registrations.filter(status=EventRegistrationStatus.CONFIRMED).values_list("pk", flat=True)
+        )
+        waitlist_ids = list(registrations.filter(status=EventRegistrationStatus.WAITLIST).values_list("pk", flat=True))
+
+        self.run_concurrently(self.cancel, confirmed_ids[:3])
+
+        statuses = self.get_statuses()
+        promoted_ids = [pk for pk in waitlist_ids if statuses[pk] == EventRegistrationStatus.CONFIRMED]
+        self.assertEqual(promoted_ids, waitlist_ids[:3])
+        self.assertEqual(list(statuses.values()).count(EventRegistrationStatus.CONFIRMED), self.capacity)
+        self.event.refresh_from_db()
+        self.assertEqual((self.event.confirmed_count, self.event.waitlist_count), (5, 12))
+
+
+class UniqueSlugTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = create_organizer()
+        cls.company = Company.objects.create(name="Acme", description="Events company")
+
+    def test_slugs_are_unique_within_a_batch(self):
+        events = [Event(title="Zeta"), Event(title="Zeta"), Event(title="Zeta 1")]
+
+        self.assertEqual(get_unique_slugs(events, "title"), ["zeta", "zeta-1", "zeta-1-1"])
+
+    def test_slugs_skip_the_suffixes_in_use(self):
+        create_event(self.organizer, self.company, title="Zeta 1")
+        events = [Event(title="Zeta"), Event(title="Zeta")]
+
+        self.assertEqual(get_unique_slugs(events, "title"), ["zeta-2", "zeta-3"])
+
+
+class EventImporterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = create_organizer()
+        cls.company = Company.objects.create(name="Acme", description="Events company")
+        cls.topic = Topic.objects.create(name=TopicCategory.values[0])
+
+    def get_row(self, **kwargs):
+        return {
+            "title": "Imported Conference",
+            "description": "Imported from a file.",
+            "event_start_time": "10:00",
+            "event_start_date": "2031-02-03",
+            "location": "Main Hall",
+            "delivery_type": "OFFLINE",
+            "status": "UPCOMING",
+            "event_type": "CONFERENCE",
+            "company": str(self.company.pk),
+            "organizer": self.organizer.pk,
+            "topics": [self.topic.pk],
+            "social_media": [{"platform": "telegram", "url": "https://t.me/imported"}],
+            **kwargs,
+        }
+
+    def run_import(self, rows, chunk_size=None):
+        stream = io.StringIO("".join(json.dumps(row) + "\n" for row in rows))
+        return EventImporter(chunk_size=chunk_size).run(stream, "ndjson")
+
+    def test_imports_valid_rows(self):
+        report = self.run_import([self.get_row(), self.get_row()])
+
+        self.assertEqual(report, {"imported": 2, "failed": 0, "errors": []})
+        self.assertEqual(
+            sorted(Event.objects.values_list("slug", flat=True)), ["imported-conference", "imported-conference-1"]
+        )
+        self.assertEqual(EventSocialMedia.objects.count(), 2)
+
+    def test_rejects_end_date_before_start_date(self):
+        report = self.run_import([self.get_row(), self.get_row(event_end_date="2031-02-02")])
+
+        self.assertEqual(report["imported"], 1)
+        self.assertEqual([error["row"] for error in report["errors"]], [2])
+        self.assertIn("event_end_date", report["errors"][0]["errors"])
+
+    def test_reports_integrity_errors_against_the_chunk_rows(self):
+        rows = [self.get_row(title=f"Imported Conference {number}") for number in range(4)]
+        bulk_create = EventSocialMedia.objects.bulk_create
+        calls = []
+
+        def fail_first_chunk(objs, *args, **kwargs):
+            calls.append(objs)
+            if len(calls) == 1:
+                raise IntegrityError("duplicate key value violates unique constraint")
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.object(EventSocialMedia.objects, "bulk_create", side_effect=fail_first_chunk):
+            report = self.run_import(rows, chunk_size=2)
+
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(report["failed"], 2)
+        self.assertEqual([error["row"] for error in report["errors"]], [1, 2])
+        self.assertEqual(
+            sorted(Event.objects.values_list("title", flat=True)), ["Imported Conference 2", "Imported Conference 3"]
+        )
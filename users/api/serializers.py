@@ -4,9 +4,10 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from rest_framework.relations import PrimaryKeyRelatedField
 from rest_framework.serializers import ModelSerializer, CharField, ValidationError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer as BaseTokenObtainPairSerializer
 
 from events.models import Topic
-from users.models import Participant, Organizer
+from users.models import Participant, Organizer, get_user_role
 from utils.tasks import send_organizer_credentials_email
 
 User = get_user_model()
@@ -107,3 +108,19 @@ class CreateOrganizerSerializer(CreateUserSerializer):
             first_name=user.first_name,
         )
         return user
+
+
+class TokenObtainPairSerializer(BaseTokenObtainPairSerializer):
+    """
+    Token serializer adding the role and the profile ids of the user to the token claims.
+    The claims are copied to the access tokens issued on refresh. They describe the user to API clients, the
+    authentication never relies on them (see `CachedJWTAuthentication`).
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["role"] = get_user_role(user)
+        token["organizer_id"] = user.organizer_profile.pk if user.is_organizer() else None
+        token["participant_id"] = user.participant_profile.pk if user.is_participant() else None
+        return token
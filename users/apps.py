@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        # Registers the OpenAPI extensions of the custom authentication classes
+        import users.schema  # noqa: F401
+        import users.signals  # noqa: F401
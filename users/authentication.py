@@ -0,0 +1,133 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.fields.files import FieldFile
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication as BaseJWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from users.models import Organizer, Participant
+
+# User fields kept in the cached snapshots of `CachedJWTAuthentication`
+USER_SNAPSHOT_FIELDS = (
+    "id",
+    "email",
+    "first_name",
+    "last_name",
+    "phone",
+    "avatar",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+# Profiles kept in the cached snapshots of `CachedJWTAuthentication`, by accessor: snapshot key and model
+SNAPSHOT_PROFILES = {
+    "organizer_profile": ("organizer_id", Organizer),
+    "participant_profile": ("participant_id", Participant),
+}
+
+
+def get_user_cache_key(user_id) -> str:
+    """
+    Return the cache key of the snapshot of a user.
+    """
+    return f"jwt_user:{user_id}"
+
+
+def get_user_snapshot(user) -> dict:
+    """
+    Return the values of `USER_SNAPSHOT_FIELDS` for a user, files as their names, with the ids of
+    the profiles of `SNAPSHOT_PROFILES`.
+    """
+    values = {field: getattr(user, field) for field in USER_SNAPSHOT_FIELDS}
+    snapshot = {field: value.name if isinstance(value, FieldFile) else value for field, value in values.items()}
+    for accessor, (key, profile_model) in SNAPSHOT_PROFILES.items():
+        profile = getattr(user, accessor, None)
+        snapshot[key] = profile.pk if profile else None
+    return snapshot
+
+
+class JWTAuthentication(BaseJWTAuthentication):
+    """
+    JWT authentication loading the user together with their organizer and participant profiles.
+
+    Role checks (`User.is_organizer()`, `User.is_participant()`) and profile accesses are then answered
+    from the request user without further queries, so authentication costs a single query per request.
+    """
+
+    profile_fields = ("organizer_profile", "participant_profile")
+
+    def get_user(self, validated_token):
+        """
+        Return the user of the token, with the same checks as simplejwt's `JWTAuthentication.get_user`.
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        try:
+            user = self.user_model.objects.select_related(*self.profile_fields).get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication serving the user from a cached snapshot instead of the database.
+
+    The snapshot holds the fields of `USER_SNAPSHOT_FIELDS` and the ids of the organizer and participant
+    profiles for `JWT_USER_CACHE_TIMEOUT` seconds. It is dropped whenever the user or one of their profiles
+    is saved or deleted (see `users.signals`), so deactivated users, staff changes and new or deleted profiles
+    are picked up by the next request. The role and profile claims of the token are never trusted. Cache
+    misses are authenticated from the database as usual.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cache_key = get_user_cache_key(user_id)
+        snapshot = cache.get(cache_key)
+        if snapshot is None or any(key not in snapshot for key, profile_model in SNAPSHOT_PROFILES.values()):
+            # Raises for unknown and inactive users, which are never cached
+            user = super().get_user(validated_token)
+            cache.set(cache_key, get_user_snapshot(user), settings.JWT_USER_CACHE_TIMEOUT)
+            return user
+        return self.get_snapshot_user(snapshot)
+
+    def get_snapshot_user(self, snapshot):
+        """
+        Return a user built from a cached snapshot, with its profiles.
+        Fields left out of the snapshot are deferred, and loaded from the database if accessed.
+        """
+        # `from_db` expects the values in the order of the model fields
+        field_names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in snapshot]
+        user = self.user_model.from_db(DEFAULT_DB_ALIAS, field_names, [snapshot[name] for name in field_names])
+        for accessor, (key, profile_model) in SNAPSHOT_PROFILES.items():
+            profile = None
+            if snapshot[key] is not None:
+                profile = profile_model.from_db(DEFAULT_DB_ALIAS, ("id", "user_id"), (snapshot[key], user.pk))
+                profile_model._meta.get_field("user").set_cached_value(profile, user)
+            self.user_model._meta.get_field(accessor).set_cached_value(user, profile)
+        return user
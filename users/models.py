@@ -16,6 +16,21 @@ def get_avatar_path(instance, filename: str) -> str:
     return create_custom_image_file_path(instance, filename, "images/avatars")
 
 
+def get_user_role(user) -> str:
+    """
+    Return the role of the user, used to separate cached responses and as the `role` claim of tokens.
+    """
+    if not user or not user.is_authenticated:
+        return "anonymous"
+    if user.is_staff:
+        return "admin"
+    if user.is_organizer():
+        return "organizer"
+    if user.is_participant():
+        return "participant"
+    return "user"
+
+
 class User(AbstractUser):
     """
     Custom User model where email is used as the unique identifier instead of username.
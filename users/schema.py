@@ -0,0 +1,18 @@
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme, TokenObtainPairSerializerExtension
+
+
+class JWTScheme(SimpleJWTScheme):
+    """
+    Document `users.authentication.JWTAuthentication` and its subclasses as simplejwt's bearer scheme.
+    """
+
+    target_class = "users.authentication.JWTAuthentication"
+    match_subclasses = True
+
+
+class TokenObtainPairSerializerScheme(TokenObtainPairSerializerExtension):
+    """
+    Document the login payload of `users.api.serializers.TokenObtainPairSerializer`.
+    """
+
+    target_class = "users.api.serializers.TokenObtainPairSerializer"
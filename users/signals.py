@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.authentication import get_user_cache_key
+from users.models import Organizer, Participant, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """
+    Drop the cached authentication snapshot of a user whenever the user changes, e.g. is deactivated.
+    The deletion is deferred until the current transaction commits, so that concurrent requests can't
+    cache the previous state again.
+    """
+    cache_key = get_user_cache_key(instance.pk)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+
+
+@receiver(post_save, sender=Organizer)
+@receiver(post_delete, sender=Organizer)
+@receiver(post_save, sender=Participant)
+@receiver(post_delete, sender=Participant)
+def invalidate_profile_user_snapshot(sender, instance, **kwargs):
+    """
+    Drop the cached authentication snapshot of a user whenever one of their profiles is created or deleted,
+    so that their role follows on the next request.
+    """
+    cache_key = get_user_cache_key(instance.user_id)
+    transaction.on_commit(lambda: cache.delete(cache_key))
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+
+from users.api.serializers import TokenObtainPairSerializer
+from users.authentication import CachedJWTAuthentication, JWTAuthentication
+from users.models import Organizer, Participant, User
+
+
+def create_user(email, **kwargs):
+    """
+    Create a user with a unique phone number.
+    """
+    return User.objects.create_user(email=email, password="password", phone=email, **kwargs)
+
+
+def get_authenticated_request(user):
+    """
+    Return a request carrying an access token of the user, as issued by the login endpoint.
+    """
+    token = TokenObtainPairSerializer.get_token(user).access_token
+    return APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+
+
+class JWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = Organizer.objects.create(user=create_user("organizer@example.com"))
+        cls.participant = Participant.objects.create(user=create_user("participant@example.com"))
+        cls.user = create_user("user@example.com")
+
+    def authenticate(self, user):
+        """
+        Authenticate a request of the user and check its roles, with a single query.
+        """
+        request = get_authenticated_request(user)
+        with self.assertNumQueries(1):
+            authenticated_user, _ = JWTAuthentication().authenticate(request)
+            roles = (authenticated_user.is_organizer(), authenticated_user.is_participant())
+            profiles = (
+                getattr(authenticated_user, "organizer_profile", None),
+                getattr(authenticated_user, "participant_profile", None),
+            )
+        self.assertEqual(authenticated_user, user)
+        return roles, profiles
+
+    def test_organizer_profile_is_loaded_with_the_user(self):
+        roles, profiles = self.authenticate(self.organizer.user)
+
+        self.assertEqual(roles, (True, False))
+        self.assertEqual(profiles, (self.organizer, None))
+
+    def test_participant_profile_is_loaded_with_the_user(self):
+        roles, profiles = self.authenticate(self.participant.user)
+
+        self.assertEqual(roles, (False, True))
+        self.assertEqual(profiles, (None, self.participant))
+
+    def test_user_without_profile(self):
+        roles, profiles = self.authenticate(self.user)
+
+        self.assertEqual(roles, (False, False))
+        self.assertEqual(profiles, (None, None))
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.participant = Participant.objects.create(user=create_user("participant@example.com"))
+        cls.user = create_user("user@example.com")
+
+    def setUp(self):
+        cache.clear()
+
+    def authenticate(self, request):
+        user, _ = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_cached_user_is_authenticated_without_queries(self):
+        request = get_authenticated_request(self.participant.user)
+        self.authenticate(request)
+
+        with self.assertNumQueries(0):
+            user = self.authenticate(request)
+            self.assertEqual((user.is_organizer(), user.is_participant()), (False, True))
+        self.assertEqual(user.participant_profile.pk, self.participant.pk)
+
+    def test_created_profile_is_picked_up_despite_the_token_claims(self):
+        request = get_authenticated_request(self.user)
+        self.assertFalse(self.authenticate(request).is_organizer())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            organizer = Organizer.objects.create(user=self.user)
+
+        user = self.authenticate(request)
+        self.assertTrue(user.is_organizer())
+        self.assertEqual(user.organizer_profile.pk, organizer.pk)
+
+    def test_deleted_profile_is_picked_up_despite_the_token_claims(self):
+        request = get_authenticated_request(self.participant.user)
+        self.assertTrue(self.authenticate(request).is_participant())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.participant.delete()
+
+        self.assertFalse(self.authenticate(request).is_participant())
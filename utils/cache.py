@@ -0,0 +1,103 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from users.models import get_user_role
+
+# Prefix of the shared hit/miss counters of the response cache
+RESPONSE_CACHE_STATS_PREFIX = "response_cache_stats"
+
+
+def get_cache_version(namespace: str) -> str:
+    """
+    Return the current version token of a cache namespace.
+    """
+    return cache.get_or_set(f"{namespace}:version", lambda: uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_cache_namespace(namespace: str) -> None:
+    """
+    Invalidate every entry of a cache namespace at once by replacing its version token.
+    Stale entries are never read again and expire on their own.
+    The invalidation is deferred until the current transaction commits, so that concurrent
+    requests can't cache data which is about to change.
+    """
+    transaction.on_commit(lambda: cache.set(f"{namespace}:version", uuid.uuid4().hex, timeout=None))
+
+
+def make_cache_key(namespace: str, *parts) -> str:
+    """
+    Build a versioned cache key for the given namespace from arbitrary parts.
+    """
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode(), usedforsecurity=False).hexdigest()
+    return f"{namespace}:{get_cache_version(namespace)}:{digest}"
+
+
+def record_response_cache_lookup(namespace: str, hit: bool) -> None:
+    """
+    Increment the shared hit or miss counter of a response cache namespace.
+    """
+    key = f"{RESPONSE_CACHE_STATS_PREFIX}:{namespace}:{'hits' if hit else 'misses'}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_response_cache_stats(namespaces) -> dict:
+    """
+    Return the hit/miss counters and hit ratio of the given response cache namespaces.
+    """
+    stats = {}
+    for namespace in namespaces:
+        counters = cache.get_many(
+            [f"{RESPONSE_CACHE_STATS_PREFIX}:{namespace}:hits", f"{RESPONSE_CACHE_STATS_PREFIX}:{namespace}:misses"]
+        )
+        hits = counters.get(f"{RESPONSE_CACHE_STATS_PREFIX}:{namespace}:hits", 0)
+        misses = counters.get(f"{RESPONSE_CACHE_STATS_PREFIX}:{namespace}:misses", 0)
+        total = hits + misses
+        stats[namespace] = {"hits": hits, "misses": misses, "hit_ratio": round(hits / total, 4) if total else None}
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    ViewSet mixin caching the serialized payloads of `list` and `retrieve` per URL and user role.
+
+    Detail entries live in the `<cache_namespace>:<lookup value>` namespace and list entries
+    in `<cache_namespace>:list`, so that a change to one object only invalidates its own detail
+    payload and the lists.
+    """
+
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(f"{self.cache_namespace}:list", super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_value = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        return self.get_cached_response(
+            f"{self.cache_namespace}:{lookup_value}", super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, namespace, handler, request, *args, **kwargs):
+        """
+        Return the cached payload for the request, or call the handler and cache its payload.
+        """
+        cache_key = make_cache_key(namespace, get_user_role(request.user), request.build_absolute_uri())
+        data = cache.get(cache_key)
+        record_response_cache_lookup(self.cache_namespace, hit=data is not None)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(cache_key, response.data, settings.API_RESPONSE_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
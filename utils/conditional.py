@@ -0,0 +1,65 @@
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    ViewSet mixin adding an ETag validator to `list` and `retrieve`, plus Last-Modified to `retrieve`,
+    and answering conditional requests with 304 Not Modified before anything is serialized.
+
+    The validators are computed with one lightweight query reading only `(id, updated_at)` of the
+    requested object, or of the rows of the requested page. Models must therefore bump `updated_at`
+    on every change affecting their representation.
+
+    Lists get no Last-Modified: a row leaving the page (deleted, or filtered out) changes the page
+    without moving the newest `updated_at` of the rows left on it. The ETag covers the ids, so it does.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            queryset = self.paginator.get_page_queryset(queryset, request, view=self)
+        rows = list(queryset.prefetch_related(None).values_list("pk", "updated_at"))
+        return self.get_conditional_response(request, rows, super().list, *args, last_modified=False, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            queryset = queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+            rows = list(queryset.prefetch_related(None).values_list("pk", "updated_at")[:1])
+        except (TypeError, ValueError, DjangoValidationError):
+            # Let `get_object` answer with a 404
+            rows = []
+        return self.get_conditional_response(request, rows, super().retrieve, *args, **kwargs)
+
+    def get_conditional_response(self, request, rows, handler, *args, last_modified=True, **kwargs):
+        """
+        Return 304 Not Modified if the client's validators match the given `(id, updated_at)` rows,
+        otherwise call the handler and add the validators to its response.
+        Last-Modified is only used when `last_modified` is set.
+        """
+        if not rows:
+            return handler(request, *args, **kwargs)
+
+        etag = self.get_etag(request, rows)
+        # HTTP dates have a one second resolution
+        last_modified = int(max(updated_at for _, updated_at in rows).timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def get_etag(self, request, rows):
+        """
+        Return an ETag identifying the representation of the given rows for this request.
+        """
+        fingerprint = f"{request.get_full_path()}|{request.accepted_renderer.format}|{rows}"
+        return quote_etag(hashlib.md5(fingerprint.encode(), usedforsecurity=False).hexdigest())
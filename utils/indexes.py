@@ -0,0 +1,15 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.db import models
+
+
+class SearchVectorIndex(GinIndex):
+    """
+    GIN index for full-text search vectors.
+    Falls back to a plain index on databases other than PostgreSQL, so that the schema
+    can still be created on SQLite for local development and tests.
+    """
+
+    def create_sql(self, model, schema_editor, using="", **kwargs):
+        if schema_editor.connection.vendor != "postgresql":
+            return models.Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
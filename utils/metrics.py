@@ -0,0 +1,329 @@
+import bisect
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from billiard.process import current_process
+from celery import signals as celery_signals
+from celery.concurrency import get_implementation
+from celery.concurrency.prefork import TaskPool as PreforkTaskPool
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bounds (seconds) of the latency histogram buckets
+REQUEST_DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+TASK_DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+def escape_label_value(value) -> str:
+    """
+    Return a label value escaped for the text exposition format.
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_sample(name, labelnames, label_values, value, extra_label="") -> str:
+    """
+    Return a sample line of the text exposition format.
+    """
+    labels = [f'{label}="{escape_label_value(label_value)}"' for label, label_value in zip(labelnames, label_values)]
+    if extra_label:
+        labels.append(extra_label)
+    return f"{name}{{{','.join(labels)}}} {value}" if labels else f"{name} {value}"
+
+
+def format_bound(bound) -> str:
+    """
+    Return the `le` label value of a histogram bucket bound.
+    """
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class MetricsRegistry:
+    """
+    Set of metrics rendered together in the Prometheus text exposition format.
+    """
+
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Metric:
+    """
+    Base class of the metrics, holding one value per combination of label values.
+
+    Label values are passed positionally in the order of `labelnames`. Updates take a lock per metric,
+    so a metric can be shared by the threads of a process; every process has its own values.
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def render(self) -> list:
+        with self.lock:
+            values = list(self.values.items())
+        return [format_sample(self.name, self.labelnames, label_values, value) for label_values, value in values]
+
+
+class Counter(Metric):
+    """
+    Monotonically increasing count.
+    """
+
+    type = "counter"
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Value going up and down, or computed when the metrics are rendered if `collect` is given.
+    `collect()` returns a dictionary of values by label values tuple.
+    """
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY, collect=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.collect = collect
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, value, *label_values):
+        with self.lock:
+            self.values[label_values] = value
+
+    def render(self) -> list:
+        if self.collect is None:
+            return super().render()
+        try:
+            values = self.collect()
+        except Exception:
+            logger.exception("Could not collect the %s metric", self.name)
+            return []
+        return [
+            format_sample(self.name, self.labelnames, label_values, value) for label_values, value in values.items()
+        ]
+
+
+class Histogram(Metric):
+    """
+    Distribution of observed values in cumulative buckets, with their sum and count.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY, buckets=REQUEST_DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        # Values are counted in the first bucket they fit in and accumulated when rendered
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            counts = self.values.get(label_values)
+            if counts is None:
+                # One count per bucket, then the `+Inf` bucket and the sum
+                counts = self.values[label_values] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def render(self) -> list:
+        with self.lock:
+            values = [(label_values, list(counts)) for label_values, counts in self.values.items()]
+        lines = []
+        for label_values, counts in values:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                lines.append(
+                    format_sample(
+                        f"{self.name}_bucket",
+                        self.labelnames,
+                        label_values,
+                        cumulative,
+                        extra_label=f'le="{format_bound(bound)}"',
+                    )
+                )
+            lines.append(format_sample(f"{self.name}_sum", self.labelnames, label_values, counts[-1]))
+            lines.append(format_sample(f"{self.name}_count", self.labelnames, label_values, cumulative))
+        return lines
+
+
+def collect_database_connections() -> dict:
+    """
+    Return the number of connections to the default PostgreSQL database by state, from `pg_stat_activity`.
+    The count covers every client of the database (API processes, Celery workers...).
+    """
+    connection = connections["default"]
+    if connection.vendor != "postgresql":
+        return {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COALESCE(state, 'unknown'), COUNT(*) FROM pg_stat_activity "
+            "WHERE datname = current_database() GROUP BY 1"
+        )
+        return {(state,): count for state, count in cursor.fetchall()}
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the HTTP requests by route and status code.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge("http_requests_in_progress", "Number of HTTP requests being processed.")
+DATABASE_CONNECTIONS_CREATED = Counter(
+    "db_connections_created_total", "Number of database connections opened by the process.", ["alias"]
+)
+DATABASE_CONNECTIONS = Gauge(
+    "db_connections", "Number of connections to the database by state.", ["state"], collect=collect_database_connections
+)
+TASKS = Counter("celery_tasks_total", "Number of executed Celery tasks by final state.", ["task", "state"])
+TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Duration of the Celery tasks.", ["task"], buckets=TASK_DURATION_BUCKETS
+)
+TASKS_IN_PROGRESS = Gauge("celery_tasks_in_progress", "Number of Celery tasks being executed.", ["task"])
+
+
+class MetricsMiddleware:
+    """
+    Record the duration of every request by route and status code, and the requests in progress,
+    when `METRICS_ENABLED` is on.
+
+    Requests are labelled with their URL pattern (e.g. `api/events/<str:id>/`) rather than their path,
+    so that the number of series stays bounded.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+        resolver_match = request.resolver_match
+        route = resolver_match.route if resolver_match is not None else "unmatched"
+        REQUEST_DURATION.observe(time.perf_counter() - started, request.method, route, response.status_code)
+        return response
+
+
+@connection_created.connect
+def count_database_connection(sender, connection, **kwargs):
+    if settings.METRICS_ENABLED:
+        DATABASE_CONNECTIONS_CREATED.inc(connection.alias)
+
+
+# Start times of the tasks being executed, by task id
+task_start_times = {}
+
+
+@celery_signals.task_prerun.connect
+def record_task_start(task_id, task, **kwargs):
+    if settings.METRICS_ENABLED:
+        task_start_times[task_id] = time.perf_counter()
+        TASKS_IN_PROGRESS.inc(task.name)
+
+
+@celery_signals.task_postrun.connect
+def record_task_end(task_id, task, state=None, **kwargs):
+    started = task_start_times.pop(task_id, None)
+    if started is None:
+        return
+    TASKS_IN_PROGRESS.dec(task.name)
+    TASK_DURATION.observe(time.perf_counter() - started, task.name)
+    TASKS.inc(task.name, (state or "unknown").lower())
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serve the metrics of the process on any path.
+    """
+
+    def do_GET(self):
+        try:
+            content = REGISTRY.render().encode()
+        finally:
+            # The database connections of the server thread are only used to collect the metrics
+            connections.close_all()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port):
+    """
+    Serve the metrics of the process over HTTP on the given port, from a daemon thread.
+    """
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info("Serving metrics on port %d", port)
+    return server
+
+
+@celery_signals.worker_init.connect
+def start_worker_metrics_server(sender, **kwargs):
+    # Tasks of the prefork pool run in child processes, which serve their own metrics, see below
+    if not settings.METRICS_ENABLED or not settings.METRICS_WORKER_PORT:
+        return
+    if get_implementation(sender.pool_cls) is not PreforkTaskPool:
+        try:
+            start_metrics_server(settings.METRICS_WORKER_PORT)
+        except OSError:
+            logger.exception("Could not serve the worker metrics on port %d", settings.METRICS_WORKER_PORT)
+
+
+@celery_signals.worker_process_init.connect
+def start_pool_process_metrics_server(**kwargs):
+    # Each pool process serves its metrics on the worker port plus its index in the pool
+    if not settings.METRICS_ENABLED or not settings.METRICS_WORKER_PORT:
+        return
+    port = settings.METRICS_WORKER_PORT + current_process().index
+    try:
+        start_metrics_server(port)
+    except OSError:
+        logger.exception("Could not serve the pool process metrics on port %d", port)
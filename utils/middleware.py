@@ -0,0 +1,160 @@
+import heapq
+import logging
+import time
+import traceback
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Length of the SQL statements shown in headers and logs
+MAX_SQL_LENGTH = 200
+
+
+def truncate_sql(sql) -> str:
+    """
+    Return the SQL statement on a single line, truncated to `MAX_SQL_LENGTH` characters.
+    """
+    sql = " ".join(sql.split())
+    return sql if len(sql) <= MAX_SQL_LENGTH else f"{sql[:MAX_SQL_LENGTH]}..."
+
+
+def get_call_site() -> str:
+    """
+    Return the innermost frame of the project code in the current stack, as `path:line in function`.
+    """
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(base_dir) and "site-packages" not in frame.filename and frame.filename != __file__:
+            return f"{Path(frame.filename).relative_to(base_dir)}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper recording the number, total duration and slowest SQL statements of a request.
+
+    Statements run many times with the same SQL (only their parameters differ) are counted, and the call
+    site of those reaching `repeated_threshold` executions is captured once, which is how N+1 query
+    patterns (one query per row of a list) show up.
+    """
+
+    def __init__(self, slowest_count, repeated_threshold):
+        self.slowest_count = slowest_count
+        self.repeated_threshold = repeated_threshold
+        self.count = 0
+        self.duration = 0.0
+        # Min-heap of `(duration, order, sql)`, the order breaks ties between equal durations
+        self.slowest = []
+        self.executions = {}
+        self.call_sites = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            if len(self.slowest) < self.slowest_count:
+                heapq.heappush(self.slowest, (duration, self.count, sql))
+            elif self.slowest and duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (duration, self.count, sql))
+            executions = self.executions[sql] = self.executions.get(sql, 0) + 1
+            if executions == self.repeated_threshold:
+                self.call_sites[sql] = get_call_site()
+
+    def get_slowest(self) -> list:
+        """
+        Return the recorded slowest statements as `(duration, sql)`, slowest first.
+        """
+        return [(duration, sql) for duration, _, sql in sorted(self.slowest, reverse=True)]
+
+    def get_repeated(self) -> list:
+        """
+        Return the statements executed at least `repeated_threshold` times as `(executions, sql, call site)`.
+        """
+        return sorted(
+            ((self.executions[sql], sql, call_site) for sql, call_site in self.call_sites.items()), reverse=True
+        )
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Record the SQL queries of every request when `SQL_INSTRUMENTATION` is on.
+
+    Staff users get the query count, the database time and the slowest statements of their requests in
+    a `Server-Timing` header. Requests above `SQL_SLOW_REQUEST_QUERIES` queries or `SQL_SLOW_REQUEST_MS`
+    of database time are logged with their slowest statements, and statements repeated
+    `SQL_REPEATED_QUERY_THRESHOLD` times or more are logged as possible N+1 queries with their call site.
+    Queries run while a streaming response is sent are not recorded.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(settings.SQL_SLOWEST_QUERIES, settings.SQL_REPEATED_QUERY_THRESHOLD)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            response.headers["Server-Timing"] = self.get_server_timing(recorder, duration)
+        self.log(request, recorder, duration)
+        return response
+
+    @staticmethod
+    def get_server_timing(recorder, duration) -> str:
+        """
+        Return the `Server-Timing` header value of the request, with its slowest statements as `sql-<n>` metrics.
+        """
+        metrics = [
+            f"total;dur={1000 * duration:.2f}",
+            f'db;dur={1000 * recorder.duration:.2f};desc="{recorder.count} queries"',
+        ]
+        for index, (sql_duration, sql) in enumerate(recorder.get_slowest(), start=1):
+            description = truncate_sql(sql).replace("\\", "\\\\").replace('"', '\\"')
+            metrics.append(f'sql-{index};dur={1000 * sql_duration:.2f};desc="{description}"')
+        return ", ".join(metrics)
+
+    @staticmethod
+    def log(request, recorder, duration):
+        """
+        Log the request if it is slow, and its repeated statements.
+        """
+        if (
+            recorder.count >= settings.SQL_SLOW_REQUEST_QUERIES
+            or 1000 * recorder.duration >= settings.SQL_SLOW_REQUEST_MS
+        ):
+            logger.warning(
+                "Slow request %s %s: %d queries in %.1fms (%.1fms in total), slowest: %s",
+                request.method,
+                request.path,
+                recorder.count,
+                1000 * recorder.duration,
+                1000 * duration,
+                "; ".join(
+                    f"{1000 * sql_duration:.1f}ms {truncate_sql(sql)}" for sql_duration, sql in recorder.get_slowest()
+                ),
+            )
+        for executions, sql, call_site in recorder.get_repeated():
+            logger.warning(
+                "Possible N+1 query in %s %s: executed %d times from %s: %s",
+                request.method,
+                request.path,
+                executions,
+                call_site,
+                truncate_sql(sql),
+            )
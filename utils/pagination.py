@@ -0,0 +1,160 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor-based pagination over a unique, composite ordering.
+
+    Each page is selected with a `WHERE (ordering) > (last row of the previous page)` predicate
+    instead of an OFFSET, so the cost of a page stays the same no matter how deep it is.
+    The ordering must be unique and its fields must not be nullable.
+    """
+
+    ordering = ("id",)
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor."
+
+    def get_ordering(self, request, queryset, view=None):
+        """
+        Return the ordering used for the keyset, e.g. ("-event_start_date", "event_start_time", "id").
+        """
+        return tuple(getattr(view, "keyset_ordering", None) or self.ordering)
+
+    def get_page_size(self, request):
+        """
+        Return the requested page size, bounded by `API_MAX_PAGE_SIZE`.
+        """
+        page_size = settings.API_PAGE_SIZE
+        if self.page_size_query_param in request.query_params:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+            except ValueError:
+                pass
+        return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the (unevaluated) queryset of the requested page, including one extra row
+        which is used to detect whether there is a next page.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering(request, queryset, view)
+
+        queryset = queryset.order_by(*self.ordering_fields)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.get_keyset_filter(position))
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        return queryset[: self.page_size + 1]
+
+    def paginate_queryset(self, queryset, request, view=None):
+        results = list(self.get_page_queryset(queryset, request, view))
+        self.has_next = len(results) > self.page_size
+        results = results[: self.page_size]
+        self.next_position = self.get_position(results[-1]) if self.has_next else None
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                    "example": f"http://api.example.org/api/events/?{self.cursor_query_param}=WyIyMDI1LTAxLTAxIl0",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_position(self, obj):
+        """
+        Return the values of the ordering fields for the given row (model instance or dict).
+        """
+        names = [field.lstrip("-") for field in self.ordering_fields]
+        if isinstance(obj, dict):
+            return [obj[name] for name in names]
+        return [getattr(obj, name) for name in names]
+
+    def get_keyset_filter(self, position):
+        """
+        Build a filter selecting rows strictly after `position` in the keyset ordering.
+
+        For ordering (a, -b, c) this expands to:
+        a > x OR (a = x AND b < y) OR (a = x AND b = y AND c > z)
+        """
+        keyset_filter = Q()
+        for index, field in enumerate(self.ordering_fields):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition = Q(**{f"{name}__{lookup}": position[index]})
+            for previous_index, previous_field in enumerate(self.ordering_fields[:index]):
+                condition &= Q(**{previous_field.lstrip("-"): position[previous_index]})
+            keyset_filter |= condition
+        return keyset_filter
+
+    def encode_cursor(self, position):
+        """
+        Encode a position into an opaque, URL-safe cursor string.
+        """
+        data = json.dumps(position, default=str, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        """
+        Decode the cursor from the request. Returns None if no cursor was passed.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            position = json.loads(data)
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering_fields):
+            raise NotFound(self.invalid_cursor_message)
+        return position
@@ -59,7 +59,7 @@ class IsEventOrganizerOrAdminUserOrReadOnly(BasePermission):
 
         # Organizers have access only to their events
         if request.user.is_organizer():
-            return obj.organizer.user == request.user
+            return obj.organizer_id == request.user.organizer_profile.pk
         return False
 
 
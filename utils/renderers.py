@@ -0,0 +1,132 @@
+import csv
+import io
+from itertools import islice
+
+from django.conf import settings
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed, falling back to the standard library encoder.
+
+    The output is the same as the one of `JSONRenderer`: values orjson doesn't handle the same way
+    (datetimes, decimals, lazy strings...) are passed to DRF's encoder, and pretty-printed responses
+    (`indent` in the Accept header) as well as data orjson can't encode use the standard encoder.
+    """
+
+    orjson_options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=JSONEncoder().default, option=self.orjson_options)
+        except TypeError:
+            # e.g. non-string dictionary keys or integers above 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped by JSONRenderer as well, they are invalid in JavaScript strings
+        return ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+
+
+class StreamingJSONRenderer(FastJSONRenderer):
+    """
+    JSON renderer able to stream a JSON array chunk by chunk with `render_stream`.
+
+    Views opt in by listing it in `renderer_classes` and returning a `StreamingHttpResponse` over
+    `render_stream(items)` when it is the accepted renderer, see `iterate_representations`.
+    Other responses (errors, paginated payloads) are rendered as a whole.
+    """
+
+    def render_stream(self, items, renderer_context=None):
+        """
+        Yield the JSON array of the given items, one encoded chunk of `API_STREAMING_CHUNK_SIZE` items at a time.
+        """
+        items = iter(items)
+        separator = b"["
+        while chunk := list(islice(items, settings.API_STREAMING_CHUNK_SIZE)):
+            # Each chunk is encoded as one array, whose brackets are replaced by the separators
+            yield separator + self.render(chunk, renderer_context=renderer_context)[1:-1]
+            separator = b","
+        yield b"]" if separator == b"," else b"[]"
+
+
+class NDJSONRenderer(FastJSONRenderer):
+    """
+    Newline-delimited JSON renderer, one JSON document per line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        items = data if isinstance(data, list) else [data]
+        return b"".join(self.render_stream(items, renderer_context))
+
+    def render_stream(self, items, renderer_context=None):
+        """
+        Yield the lines of the given items, one chunk of `API_STREAMING_CHUNK_SIZE` items at a time.
+        """
+        items = iter(items)
+        while chunk := list(islice(items, settings.API_STREAMING_CHUNK_SIZE)):
+            yield b"".join(FastJSONRenderer.render(self, item) + b"\n" for item in chunk)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV renderer for flat dictionaries, with a header row.
+    The columns are taken from `renderer_context["header"]`, or from the keys of the first item.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        items = data if isinstance(data, list) else [data]
+        return b"".join(self.render_stream(items, renderer_context))
+
+    def render_stream(self, items, renderer_context=None):
+        """
+        Yield the header and the rows of the given items, one chunk of `API_STREAMING_CHUNK_SIZE` rows at a time.
+        """
+        items = iter(items)
+        chunk = list(islice(items, settings.API_STREAMING_CHUNK_SIZE))
+        fieldnames = (renderer_context or {}).get("header") or (list(chunk[0]) if chunk else None)
+        if not fieldnames:
+            return
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+        writer.writeheader()
+        while True:
+            writer.writerows(chunk)
+            yield buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
+            chunk = list(islice(items, settings.API_STREAMING_CHUNK_SIZE))
+            if not chunk:
+                break
+
+
+def iterate_representations(queryset, serialize, chunk_size=None):
+    """
+    Yield the representation of every row of the queryset, fetching and serializing them in chunks
+    with `serialize(rows)` so that memory use is bounded by the chunk size instead of the queryset size.
+    """
+    chunk_size = chunk_size or settings.API_STREAMING_CHUNK_SIZE
+    rows = queryset.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield from serialize(chunk)
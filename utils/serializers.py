@@ -0,0 +1,76 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsetMixin:
+    """
+    ModelSerializer mixin letting read requests pick the fields they need.
+
+    `?fields=title,city` restricts the output to the listed fields and `?omit=description` removes
+    fields from it. Without `fields` the output is restricted to `Meta.default_fields` (all fields if
+    not set), so compact list serializers can still return any field on demand.
+    Write requests always use every field.
+    """
+
+    fields_query_param = "fields"
+    omit_query_param = "omit"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        if request is not None and request.method in SAFE_METHODS:
+            requested_fields = self.get_requested_fields(request)
+            for field_name in list(self.fields):
+                if field_name not in requested_fields:
+                    self.fields.pop(field_name)
+
+    @classmethod
+    def get_requested_fields(cls, request) -> list:
+        """
+        Return the names of the fields requested with the `fields` and `omit` query parameters.
+        """
+        available_fields = list(cls.Meta.fields)
+        fields = cls.parse_field_names(request, cls.fields_query_param, available_fields)
+        omit = cls.parse_field_names(request, cls.omit_query_param, available_fields)
+        if not fields:
+            fields = getattr(cls.Meta, "default_fields", available_fields)
+        return [field_name for field_name in fields if field_name not in omit]
+
+    @staticmethod
+    def parse_field_names(request, query_param, available_fields) -> list:
+        """
+        Return the comma-separated field names of a query parameter, rejecting unknown fields.
+        """
+        field_names = [
+            field_name.strip()
+            for value in request.query_params.getlist(query_param)
+            for field_name in value.split(",")
+            if field_name.strip()
+        ]
+        unknown_fields = [field_name for field_name in field_names if field_name not in available_fields]
+        if unknown_fields:
+            raise ValidationError({query_param: f"Unknown fields: {', '.join(unknown_fields)}."})
+        return field_names
+
+    @classmethod
+    def get_model_field_names(cls, field_names) -> list:
+        """
+        Return the model columns to load for the given serializer fields, for use with `QuerySet.only()`.
+        Computed fields declare the columns they read in `Meta.field_dependencies`, relations loaded
+        with a separate query (reverse and many-to-many) are skipped.
+        """
+        model = cls.Meta.model
+        dependencies = getattr(cls.Meta, "field_dependencies", {})
+        model_field_names = []
+        for field_name in field_names:
+            if field_name in dependencies:
+                model_field_names.extend(dependencies[field_name])
+                continue
+            try:
+                field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                model_field_names.append(field_name)
+        return list(dict.fromkeys(model_field_names))
@@ -2,32 +2,25 @@ from datetime import datetime
 
 from celery import shared_task
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import send_mail, send_mass_mail
 from django.utils.timezone import localtime
 
-from events.models import Event
+from events.models import Event, EventRegistration
 
 
-@shared_task
-def send_registration_email(user_email, registration_details):
+def get_registration_email_message(event, registration_id, status, created_at, updated_at):
     """
-    Sends an email with the user's registration details.
+    Returns the body of the email sent to a participant about their registration.
     """
-    subject = "Registration Details"
-
-    event = Event.objects.get(id=registration_details.get("event"))
-    status = registration_details.get("status")
-    created_at = datetime.fromisoformat(registration_details.get("created_at"))
-    updated_at = datetime.fromisoformat(registration_details.get("updated_at"))
     created_at = localtime(created_at)
     updated_at = localtime(updated_at)
 
-    message = f"""
+    return f"""
         Dear Participant,
 
         Thank you for registering for the event. Below are your registration details:
 
-        Registration ID: {registration_details.get("id")}
+        Registration ID: {registration_id}
         Status: {status}
 
         Event Information:
@@ -46,6 +39,23 @@ def send_registration_email(user_email, registration_details):
         Best regards,
         Event Management Team
         """
+
+
+@shared_task
+def send_registration_email(user_email, registration_details):
+    """
+    Sends an email with the user's registration details.
+    """
+    subject = "Registration Details"
+
+    event = Event.objects.get(id=registration_details.get("event"))
+    message = get_registration_email_message(
+        event,
+        registration_details.get("id"),
+        registration_details.get("status"),
+        datetime.fromisoformat(registration_details.get("created_at")),
+        datetime.fromisoformat(registration_details.get("updated_at")),
+    )
     from_email = settings.EMAIL_HOST_USER
     send_mail(
         subject,
@@ -55,6 +65,35 @@ def send_registration_email(user_email, registration_details):
     )
 
 
+@shared_task
+def send_bulk_registration_emails(registration_ids):
+    """
+    Sends the registration details emails of many registrations over a single connection.
+    """
+    subject = "Registration Details"
+    from_email = settings.EMAIL_HOST_USER
+
+    registrations = EventRegistration.objects.filter(pk__in=registration_ids).select_related(
+        "participant__user", "event__organizer__user"
+    )
+    messages = [
+        (
+            subject,
+            get_registration_email_message(
+                registration.event,
+                registration.pk,
+                registration.status,
+                registration.created_at,
+                registration.updated_at,
+            ),
+            from_email,
+            [registration.participant.user.email],
+        )
+        for registration in registrations.iterator(chunk_size=500)
+    ]
+    send_mass_mail(messages)
+
+
 @shared_task
 def send_organizer_credentials_email(email, password, first_name):
     """
@@ -1,8 +1,22 @@
 import os
 import uuid
+from collections import Counter
+from functools import reduce
+from operator import or_
 
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.utils.text import slugify
 
+# Room left at the end of generated slugs for a numeric suffix, e.g. "-12345"
+SLUG_SUFFIX_LENGTH = 6
+
+# Number of base slugs looked up by one query
+SLUG_LOOKUP_BATCH_SIZE = 500
+
+# Number of times a save is retried when a concurrent save took the same slug
+SLUG_SAVE_ATTEMPTS = 3
+
 
 def create_custom_image_file_path(instance, filename, path) -> str:
     _, extension = os.path.splitext(filename)
@@ -10,6 +24,91 @@ def create_custom_image_file_path(instance, filename, path) -> str:
     return os.path.join(path, new_filename)
 
 
+def get_base_slug(instance, field_name, slug_field_name="slug") -> str:
+    """
+    Return the slug of the instance without suffix, truncated so that a suffix still fits in the slug field.
+    """
+    max_length = instance._meta.get_field(slug_field_name).max_length - SLUG_SUFFIX_LENGTH
+    base_slug = slugify(getattr(instance, field_name, ""))[:max_length].strip("-")
+    return base_slug or instance._meta.model_name
+
+
+def get_unique_slugs(instances, field_name, slug_field_name="slug") -> list:
+    """
+    Return a unique slug for each of the given instances of a model.
+
+    Slugs are made unique with a numeric suffix (`annual-tech-conference`, `annual-tech-conference-1`...),
+    following the highest suffix in use for the same base slug and skipping any slug already in use or
+    assigned to an earlier instance. The slugs in use are read with one query per `SLUG_LOOKUP_BATCH_SIZE`
+    distinct base slugs, plus one per batch of base slugs which are taken or shared by several instances.
+    """
+    instances = list(instances)
+    if not instances:
+        return []
+    model_class = instances[0].__class__
+    base_slugs = [get_base_slug(instance, field_name, slug_field_name) for instance in instances]
+
+    # Base slugs are looked up first, the suffixed slugs only for the base slugs which will get a suffix.
+    # The prefix lookups can use the pattern index of the slug column on PostgreSQL, the slugs of other
+    # base slugs they match (e.g. `annual-tech` for `annual`) are ignored when picking the next suffix
+    manager = model_class._default_manager
+    base_slug_counts = Counter(base_slugs)
+    distinct_base_slugs = list(base_slug_counts)
+    existing_slugs = []
+    for start in range(0, len(distinct_base_slugs), SLUG_LOOKUP_BATCH_SIZE):
+        batch = distinct_base_slugs[start : start + SLUG_LOOKUP_BATCH_SIZE]
+        existing_slugs.extend(
+            manager.filter(**{f"{slug_field_name}__in": batch}).values_list(slug_field_name, flat=True)
+        )
+    suffixed_base_slugs = list({*existing_slugs, *(slug for slug, count in base_slug_counts.items() if count > 1)})
+    for start in range(0, len(suffixed_base_slugs), SLUG_LOOKUP_BATCH_SIZE):
+        batch = suffixed_base_slugs[start : start + SLUG_LOOKUP_BATCH_SIZE]
+        lookups = (Q(**{f"{slug_field_name}__startswith": f"{base_slug}-"}) for base_slug in batch)
+        existing_slugs.extend(manager.filter(reduce(or_, lookups)).values_list(slug_field_name, flat=True))
+
+    # Next suffix per base slug, 0 standing for the base slug itself
+    next_suffixes = dict.fromkeys(base_slugs, 0)
+    for slug in existing_slugs:
+        if slug in next_suffixes:
+            next_suffixes[slug] = max(next_suffixes[slug], 1)
+        base_slug, _, suffix = slug.rpartition("-")
+        if base_slug in next_suffixes and suffix.isdigit():
+            next_suffixes[base_slug] = max(next_suffixes[base_slug], int(suffix) + 1)
+
+    # Slugs in use or assigned so far, e.g. `zeta-1` assigned to the second "Zeta" is skipped for "Zeta 1"
+    used_slugs = set(existing_slugs)
+    slugs = []
+    for base_slug in base_slugs:
+        suffix = next_suffixes[base_slug]
+        slug = f"{base_slug}-{suffix}" if suffix else base_slug
+        while slug in used_slugs:
+            suffix += 1
+            slug = f"{base_slug}-{suffix}"
+        next_suffixes[base_slug] = suffix + 1
+        used_slugs.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def assign_unique_slugs(instances, field_name, slug_field_name="slug") -> list:
+    """
+    Set a unique slug on each of the given instances of a model, e.g. before a `bulk_create`.
+
+    Args:
+        instances: The model instances to set the slug of.
+        field_name: The name of the field to base the slug on (e.g., "title").
+        slug_field_name: The name of the field to store the slug (default: "slug").
+
+    Returns:
+        The generated slugs, in the order of the instances.
+    """
+    instances = list(instances)
+    slugs = get_unique_slugs(instances, field_name, slug_field_name)
+    for instance, slug in zip(instances, slugs):
+        setattr(instance, slug_field_name, slug)
+    return slugs
+
+
 def generate_unique_slug(instance, field_name, slug_field_name="slug"):
     """
     Generate a unique slug for a model instance.
@@ -22,14 +121,29 @@ def generate_unique_slug(instance, field_name, slug_field_name="slug"):
     Returns:
         A unique slug as a string.
     """
-    field_value = getattr(instance, field_name, "")
-    original_slug = slugify(field_value)
-    unique_slug = original_slug
-    model_class = instance.__class__
-    num = 1
+    return get_unique_slugs([instance], field_name, slug_field_name)[0]
+
 
-    while model_class.objects.filter(**{slug_field_name: unique_slug}).exists():
-        unique_slug = f"{original_slug}-{num}"
-        num += 1
+def save_with_unique_slug(instance, save, field_name, slug_field_name="slug"):
+    """
+    Call `save()` after generating a unique slug for the instance if it has none.
+
+    Two concurrent saves may generate the same slug, in which case the unique index rejects the second
+    one: a new slug is then generated and the save retried, up to `SLUG_SAVE_ATTEMPTS` times.
+    """
+    if getattr(instance, slug_field_name):
+        return save()
 
-    return unique_slug
+    for attempt in range(1, SLUG_SAVE_ATTEMPTS + 1):
+        assign_unique_slugs([instance], field_name, slug_field_name)
+        try:
+            # In a savepoint, so that a failed insert doesn't break the surrounding transaction
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            slug_taken = instance.__class__._default_manager.filter(
+                **{slug_field_name: getattr(instance, slug_field_name)}
+            ).exists()
+            setattr(instance, slug_field_name, "")
+            if not slug_taken or attempt == SLUG_SAVE_ATTEMPTS:
+                raise
@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+# Serializer fields representing a database value as the value itself
+IDENTITY_FIELDS = (serializers.CharField, serializers.ChoiceField, serializers.IntegerField, serializers.BooleanField)
+
+
+class ValuesSerializer:
+    """
+    Read-only counterpart of a ModelSerializer, producing the same output from `.values()` rows.
+
+    Field converters are resolved once instead of per row, and no model or serializer instance is
+    created per row. Fields which are not columns of the model (method fields, nested serializers,
+    many-to-many relations) are filled in by `resolve_<field name>(rows)` methods returning one value
+    per row, so that their data can be loaded with a single query.
+    """
+
+    def __init__(self, serializer_class, context=None):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.context = context or {}
+        # The serializer is only instantiated to get its (possibly sparse) set of fields
+        self.fields = serializer_class(context=self.context).fields
+        self.plan = [
+            (field_name, *self.get_field_plan(field_name, field))
+            for field_name, field in self.fields.items()
+            if not field.write_only
+        ]
+
+    def get_field_plan(self, field_name, field):
+        """
+        Return the `(column, converter)` used to represent a field, `column` is None for resolved fields.
+        """
+        model_field = self.get_model_field(field)
+        if model_field is None:
+            if not hasattr(self, f"resolve_{field_name}"):
+                raise ImproperlyConfigured(f"{type(self).__name__} must define `resolve_{field_name}(rows)`.")
+            return None, None
+        if isinstance(field, IDENTITY_FIELDS):
+            return field.source, None
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and field.pk_field is None:
+            return field.source, None
+        if isinstance(field, serializers.DateTimeField):
+            return field.source, self.get_datetime_converter(field)
+        if isinstance(field, serializers.FileField):
+            return field.source, lambda name: field.to_representation(model_field.attr_class(None, model_field, name))
+        return field.source, field.to_representation
+
+    @staticmethod
+    def get_datetime_converter(field):
+        """
+        Return a converter equivalent to `DateTimeField.to_representation` for aware datetimes, with the
+        output timezone resolved once instead of per value.
+        """
+        output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+        if output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+        field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+        if field_timezone is None:
+            return field.to_representation
+
+        def to_representation(value):
+            if value.tzinfo is None:
+                return field.to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+        return to_representation
+
+    def get_model_field(self, field):
+        """
+        Return the model field stored in the column behind a serializer field, if any.
+        """
+        try:
+            model_field = self.model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        return model_field if model_field.concrete and not model_field.many_to_many else None
+
+    def get_columns(self) -> list:
+        """
+        Return the columns to pass to `QuerySet.values()`, including those read by the resolvers.
+        """
+        dependencies = getattr(self.serializer_class.Meta, "field_dependencies", {})
+        columns = [self.model._meta.pk.name]
+        for field_name, column, _ in self.plan:
+            columns.extend(dependencies.get(field_name, ()) if column is None else (column,))
+        return list(dict.fromkeys(columns))
+
+    def to_representation(self, rows) -> list:
+        """
+        Return the representation of the given `.values()` rows.
+        """
+        rows = list(rows)
+        resolved = {
+            field_name: getattr(self, f"resolve_{field_name}")(rows)
+            for field_name, column, _ in self.plan
+            if column is None
+        }
+        data = []
+        for index, row in enumerate(rows):
+            item = {}
+            for field_name, column, converter in self.plan:
+                if column is None:
+                    item[field_name] = resolved[field_name][index]
+                else:
+                    value = row[column]
+                    item[field_name] = value if value is None or converter is None else converter(value)
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """
+    List view mixin serving `list` through `values_serializer_class` when `API_VALUES_SERIALIZATION` is on.
+    The response is the same as the one of the regular serializer.
+    """
+
+    values_serializer_class = ValuesSerializer
+
+    def list(self, request, *args, **kwargs):
+        if not settings.API_VALUES_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        return self.get_values_list_response(self.filter_queryset(self.get_queryset()))
+
+    def get_values_list_response(self, queryset):
+        """
+        Return the (paginated) list response of the queryset, built from `.values()` rows.
+        """
+        serializer = self.values_serializer_class(self.get_serializer_class(), context=self.get_serializer_context())
+        columns = serializer.get_columns()
+        queryset = queryset.prefetch_related(None)
+        if self.paginator is None:
+            return Response(serializer.to_representation(queryset.values(*columns)))
+
+        # The paginator reads the ordering fields of the last row to build the next cursor
+        ordering = self.paginator.get_ordering(self.request, queryset, self)
+        columns = list(dict.fromkeys([*columns, *(field.lstrip("-") for field in ordering)]))
+        page = self.paginate_queryset(queryset.values(*columns))
+        return self.get_paginated_response(serializer.to_representation(page))
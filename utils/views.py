@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework.authentication import BasicAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from utils.metrics import CONTENT_TYPE, REGISTRY
+
+
+@extend_schema(exclude=True)
+class MetricsView(APIView):
+    """
+    View serving the metrics of the process in the Prometheus text format, to admins only.
+    HTTP basic authentication is accepted as well, for scrapers configured with `basic_auth`.
+    """
+
+    authentication_classes = [*api_settings.DEFAULT_AUTHENTICATION_CLASSES, BasicAuthentication]
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        if not settings.METRICS_ENABLED:
+            raise Http404
+        return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)